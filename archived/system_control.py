@@ -9,6 +9,8 @@ from pywinauto import Application, Desktop
 from pywinauto.findwindows import ElementNotFoundError
 from pywinauto.timings import TimeoutError as PywinautoTimeoutError
 
+from .window_utils import activate_window, find_browser_window, foreground_bbox, window_bbox
+
 
 # ==================== 异常类 ====================
 
@@ -418,21 +420,14 @@ class ScreenCapturer:
             保存路径或None
         """
         try:
-            # 获取激活窗口
-            active_window = self.wm.get_active_window()
-
-            if not active_window or not active_window.is_visible():
+            bbox = foreground_bbox()
+            if not bbox:
                 raise CaptureError("无法获取激活窗口")
 
-            # 截图
-            result = self.capture_window(active_window, save_path)
-            if result:
-                self.logger.info(f"✓ 截取激活窗口: {active_window.window_text()}")
-                return result
-            else:
-                # 降级到全屏
-                self.logger.warning("激活窗口截图失败，使用全屏")
-                return self.capture_full_screen(save_path)
+            screenshot = ImageGrab.grab(bbox=bbox)
+            screenshot.save(save_path)
+            self.logger.info(f"✓ 截取激活窗口: {bbox}")
+            return save_path
 
         except Exception as e:
             self.logger.error(f"截取激活窗口失败: {e}")
@@ -442,7 +437,7 @@ class ScreenCapturer:
         """
         智能捕获浏览器窗口
 
-        策略：按优先级搜索 Chrome -> Edge -> Firefox
+        策略：一次枚举所有窗口，按优先级选择 Chrome -> Edge -> Firefox
 
         Args:
             save_path: 保存路径
@@ -450,31 +445,25 @@ class ScreenCapturer:
         Returns:
             保存路径或None
         """
-        browser_patterns = [
-            ("Chrome", r".*Chrome.*"),
-            ("Edge", r".*Edge.*"),
-            ("Firefox", r".*Firefox.*")
-        ]
-
-        for browser_name, title_pattern in browser_patterns:
-            try:
-                self.logger.info(f"查找浏览器: {browser_name}")
-                window = self.wm.find_window_by_title(title_pattern)
-
-                if window:
-                    # 激活窗口
-                    self.wm.activate_window(window)
-                    time.sleep(0.3)  # 等待窗口渲染
-
-                    # 截图
-                    result = self.capture_window(window, save_path)
-                    if result:
-                        self.logger.info(f"✓ 截取浏览器窗口: {browser_name}")
-                        return result
+        try:
+            found = find_browser_window()
+            if found:
+                browser_name, hwnd = found
+                self.logger.info(f"找到浏览器: {browser_name}")
+
+                # 激活窗口（最小化时先还原）
+                activate_window(hwnd)
+                time.sleep(0.3)  # 等待窗口渲染
+
+                bbox = window_bbox(hwnd)
+                if bbox:
+                    screenshot = ImageGrab.grab(bbox=bbox)
+                    screenshot.save(save_path)
+                    self.logger.info(f"✓ 截取浏览器窗口: {browser_name}")
+                    return save_path
 
-            except Exception as e:
-                self.logger.debug(f"浏览器 {browser_name} 截图失败: {e}")
-                continue
+        except Exception as e:
+            self.logger.debug(f"浏览器截图失败: {e}")
 
         # 降级：全屏截图
         self.logger.warning("未找到浏览器窗口，使用全屏截图")
@@ -30,7 +30,7 @@ MODELS = {
         "filename": "stt-zh.tar.bz2",
         "description": "中文语音识别模型 (Paraformer)"
     },
-    
+
     # 英文语音识别模型（Whisper Tiny，快速，75MB）
     "stt_en": {
         "url": "https://github.com/k2-fsa/sherpa-onnx/releases/download/asr-models/sherpa-onnx-whisper-tiny.en.tar.bz2",
@@ -51,6 +51,15 @@ MODELS = {
         "filename": "silero_vad.onnx",
         "description": "语音活动检测模型 (VAD)",
         "is_single_file": True
+    },
+
+    # 中英流式语音识别模型（Streaming Paraformer，可选，约1GB，不包含在"全部下载"中）
+    # 下载后需在 config.py 中设置 ASR_USE_STREAMING = True 才会启用
+    "stt_zh_streaming": {
+        "url": "https://github.com/k2-fsa/sherpa-onnx/releases/download/asr-models/sherpa-onnx-streaming-paraformer-bilingual-zh-en.tar.bz2",
+        "filename": "stt-zh-streaming.tar.bz2",
+        "description": "中英流式语音识别模型 (Streaming Paraformer)",
+        "optional": True
     }
 }
 
@@ -104,14 +113,15 @@ def main():
     
     # 选择要下载的模型
     print("请选择要下载的模型：")
-    print("1. 全部下载（推荐，约250MB）")
+    print("1. 全部下载（推荐，约250MB，不含可选的流式识别模型）")
     print("2. 仅核心功能（KWS + STT中文 + TTS中文，约173MB）")
     print("3. 自定义选择")
+    print("4. 流式识别模型（可选，约1GB，需在 config.py 中开启 ASR_USE_STREAMING）")
     
-    choice = input("\n请输入选项 (1/2/3): ").strip()
+    choice = input("\n请输入选项 (1/2/3/4): ").strip()
     
     if choice == "1":
-        selected_models = list(MODELS.keys())
+        selected_models = [key for key, info in MODELS.items() if not info.get("optional")]
     elif choice == "2":
         selected_models = ["kws", "stt_zh", "tts_zh", "vad"]
     elif choice == "3":
@@ -121,6 +131,8 @@ def main():
         
         selected_nums = input("\n请输入模型编号（用逗号分隔，如: 1,2,4): ").strip()
         selected_models = [list(MODELS.keys())[int(n)-1] for n in selected_nums.split(",")]
+    elif choice == "4":
+        selected_models = ["stt_zh_streaming"]
     else:
         print("❌ 无效选项，退出")
         return
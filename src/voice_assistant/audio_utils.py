@@ -0,0 +1,67 @@
+"""音频处理工具函数"""
+import numpy as np
+
+# numba（可选依赖）：平方求和与阈值比较融合为一次编译后的循环
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _loud_kernel(audio_data, threshold):
+        s = 0.0
+        for v in audio_data:
+            s += v * v
+        return s >= threshold * threshold * audio_data.shape[0]
+
+    # 预热：导入时完成编译（cache=True 时后续启动直接加载缓存）。
+    # 可写数组（录音缓冲区、int16 转换结果）与只读数组（采集回调中 np.frombuffer
+    # 得到的视图）在 numba 中是不同类型，两种都预热，避免在音频回调里首次编译
+    _loud_kernel(np.zeros(1, dtype=np.float32), 1.0)
+    _loud_kernel(np.frombuffer(bytes(4), dtype=np.float32), 1.0)
+else:
+    _loud_kernel = None
+
+
+def int16_to_float32(pcm_bytes):
+    """
+    int16 PCM 字节转换为 [-1, 1) 的 float32 数组
+
+    astype 产生唯一一次分配，随后原地缩放（避免除法再分配一个临时数组）
+
+    Args:
+        pcm_bytes: int16 PCM 数据（bytes 或任意缓冲区对象）
+
+    Returns:
+        np.ndarray: float32 数组（独立拥有数据）
+    """
+    audio = np.frombuffer(pcm_bytes, dtype=np.int16).astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
+
+def is_loud(audio_data, threshold):
+    """
+    判断音频块音量（RMS）是否达到阈值
+
+    安装了 numba 时由编译后的单次循环完成（无 Python 层数组调用）；否则
+    先用峰值预判：RMS 不会超过峰值，峰值低于阈值的块（大多数静音块）
+    直接判为静音，无需计算 RMS；峰值由 max/min 归约得到，不创建 abs 临时数组
+
+    Args:
+        audio_data: float32 一维音频数组
+        threshold: RMS 阈值
+
+    Returns:
+        bool: RMS >= threshold
+    """
+    if len(audio_data) == 0:
+        return False
+    if _loud_kernel is not None:
+        return bool(_loud_kernel(audio_data, threshold))
+    if max(audio_data.max(), -audio_data.min()) < threshold:
+        return False
+    # 点积一次遍历完成平方求和（不创建 audio_data**2 临时数组），
+    # 直接与 threshold² * n 比较，省去开方（与 numba 内核判定一致）
+    return float(np.dot(audio_data, audio_data)) >= threshold * threshold * len(audio_data)
@@ -9,6 +9,9 @@ ALIYUN_APPKEY = os.getenv("ALIYUN_APPKEY", "YOUR_APPKEY")
 # API URL
 DASHSCOPE_API_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
 ALIYUN_TTS_URL = "https://nls-gateway-cn-shanghai.aliyuncs.com/rest/v1/tts/async"
+# 长文本TTS完成回调：公网地址（需反向隧道转发到本地端口），为空时仅轮询
+ALIYUN_TTS_NOTIFY_URL = os.getenv("ALIYUN_TTS_NOTIFY_URL", "")
+ALIYUN_TTS_NOTIFY_PORT = int(os.getenv("ALIYUN_TTS_NOTIFY_PORT", "8765"))
 
 # 路径配置
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -23,15 +26,31 @@ CHUNK_SIZE = 512
 
 # TTS配置
 TTS_SHORT_TEXT_LIMIT = 280  # 短文本TTS字符限制
-TTS_CACHE_TIMEOUT_SHORT = 10  # 短文本缓存清理时间（秒）
-TTS_CACHE_TIMEOUT_LONG = 30   # 长文本缓存清理时间（秒）
+TTS_CACHE_MAX_BYTES = 100 * 1024 * 1024  # TTS缓存目录容量上限（超出后按LRU淘汰）
+TTS_CACHE_MIN_FREE_RATIO = 0.1  # 磁盘剩余空间低于该比例时继续淘汰TTS缓存
+TTS_CANNED_PHRASES = (  # 启动时预合成的常用短语
+    "好的", "收到", "请稍等", "再见", "已停止",
+    "抱歉，我没听清", "好的，让我来处理", "抱歉，任务未能完成",
+)
+
+# React Agent 配置
+REACT_TOOL_TOP_K = 15  # 每个命令注入系统提示词的最大工具数
 
 # 录音配置
 RECORD_SECONDS = 10  # 最大录音时长（秒），支持更长的指令
 SILENCE_THRESHOLD = 0.02  # 静音阈值
+BARGE_IN_THRESHOLD = 0.02  # TTS播放期间的打断音量阈值（低于该值视为回声，不送入KWS）
 MAX_SILENCE_FRAMES = 20  # 连续静音帧数（约1.3秒），说完即停
 MIN_RECORD_FRAMES = 15  # 最小录音保护帧数（约1秒），防止误判
 
+# 模型配置
+KWS_USE_INT8 = True  # KWS优先加载int8量化模型（存在时）；若某些CPU上反而变慢可关闭
+KWS_NUM_THREADS = 1  # KWS持续运行且每次输入很小，单线程延迟最低且不与ASR争抢CPU
+ASR_NUM_THREADS = 2  # ASR唤醒后才运行、单次输入较长，多线程收益明显
+KWS_HIGH_PRIORITY = True  # 提高KWS监听线程的调度优先级，减少系统繁忙时的唤醒漏检
+ASR_USE_STREAMING = False  # 开启且已下载流式Paraformer模型（stt_zh_streaming）时录音期间边录边识别，静音结束后几乎立即出结果
+ASR_STREAMING_TAIL_SECONDS = 0.66  # 流式识别结束时补齐的静音时长，确保最后一个字被解码
+
 # 唤醒词配置（格式：拼音音节 @中文）
 DEFAULT_WAKE_WORDS = [
     "x iǎo zh ì @小智",
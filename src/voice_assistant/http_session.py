@@ -0,0 +1,38 @@
+"""共享HTTP会话（复用TCP/TLS连接）"""
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# JSON编解码（优先使用 orjson，未安装时回退到标准库）
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    json_loads = json.loads
+
+
+def _create_session():
+    """
+    创建带连接池的HTTP会话
+
+    TTS、视觉理解和LLM请求都指向少数几个域名，复用连接可以省去每次
+    请求的TCP+TLS握手；连接失败时自动重试（仅限幂等请求）
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# 模块级单例
+session = _create_session()
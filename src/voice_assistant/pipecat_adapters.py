@@ -15,6 +15,8 @@ from pipecat.frames.frames import (
     EndFrame,
 )
 
+from .audio_utils import int16_to_float32, is_loud
+
 
 # ==================== Sherpa-ONNX KWS Processor ====================
 
@@ -31,6 +33,10 @@ class SherpaKWSProcessor(FrameProcessor):
         self.kws_model = kws_model
         self.kws_stream = kws_model.create_stream()
         self.sample_rate = 16000
+        # 每帧都要调用的模型方法，预先绑定避免重复属性查找
+        self._is_ready = kws_model.is_ready
+        self._decode_stream = kws_model.decode_stream
+        self._get_result = kws_model.get_result
         self.is_awake = False  # 用于并行 Pipeline 的条件判断
         self.last_keyword = None  # 保存最后检测到的唤醒词
 
@@ -40,16 +46,18 @@ class SherpaKWSProcessor(FrameProcessor):
 
         if isinstance(frame, AudioRawFrame):
             # 提取音频数据
-            audio_data = np.frombuffer(frame.audio, dtype=np.int16).astype(np.float32) / 32768.0
+            audio_data = int16_to_float32(frame.audio)
 
             # 喂入 KWS 模型
-            self.kws_stream.accept_waveform(self.sample_rate, audio_data)
+            kws_stream = self.kws_stream
+            kws_stream.accept_waveform(self.sample_rate, audio_data)
 
             # 检测关键词
-            while self.kws_model.is_ready(self.kws_stream):
-                self.kws_model.decode_stream(self.kws_stream)
+            is_ready, decode_stream = self._is_ready, self._decode_stream
+            while is_ready(kws_stream):
+                decode_stream(kws_stream)
 
-            result = self.kws_model.get_result(self.kws_stream)
+            result = self._get_result(kws_stream)
 
             if result:
                 print(f"🔔 检测到唤醒词: {result}")
@@ -120,15 +128,12 @@ class SherpaASRProcessor(FrameProcessor):
         # 录音过程
         if self.recording and isinstance(frame, AudioRawFrame):
             # 提取音频数据
-            audio_data = np.frombuffer(frame.audio, dtype=np.int16).astype(np.float32) / 32768.0
+            audio_data = int16_to_float32(frame.audio)
             self.buffer.append(audio_data)
             self.frame_count += 1
 
-            # 计算音量
-            volume = np.sqrt(np.mean(audio_data**2))
-
-            # 静音检测
-            if volume >= self.silence_threshold:
+            # 静音检测（峰值低于阈值时跳过 RMS 计算）
+            if is_loud(audio_data, self.silence_threshold):
                 self.has_speech = True
                 self.silence_count = 0
             else:
@@ -2,19 +2,77 @@
 import json
 import logging
 import re
+import threading
+import zlib
 import requests
-from typing import Dict, List, Any, Optional
+from collections import deque
+from typing import Deque, Dict, List, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
 from PIL import ImageGrab
 import tempfile
-import ctypes
-from ctypes import wintypes
 
-from .config import DASHSCOPE_API_KEY, DASHSCOPE_API_URL
+from .config import DASHSCOPE_API_KEY, DASHSCOPE_API_URL, REACT_TOOL_TOP_K
+from .http_session import session as http_session
 from .mcp_client import MCPManagerSync, MCPResponse
 from .tts import TTSManagerStreaming
 from .vision import VisionUnderstanding
+from .window_utils import foreground_bbox
+
+
+# 始终注入系统提示词的工具（系统提示词中直接引用）
+CORE_TOOLS = {"browser_snapshot", "browser_navigate", "browser_click", "browser_type"}
+
+# 中文指令关键词 → 工具名称/描述中的英文关键词（用于工具相关性筛选）
+TOOL_HINTS = {
+    "打开": ["navigate", "open", "launch"],
+    "访问": ["navigate", "url"],
+    "网站": ["navigate", "url"],
+    "网页": ["navigate", "page"],
+    "点击": ["click"],
+    "输入": ["type", "fill", "text"],
+    "填写": ["fill", "form"],
+    "搜索": ["type", "search"],
+    "截图": ["screenshot"],
+    "滚动": ["scroll"],
+    "关闭": ["close"],
+    "返回": ["back"],
+    "后退": ["back"],
+    "前进": ["forward"],
+    "标签": ["tab", "tabs"],
+    "等待": ["wait"],
+    "悬停": ["hover"],
+    "选择": ["select", "option"],
+    "上传": ["upload", "file"],
+    "拖": ["drag"],
+    "按": ["press", "key"],
+    "快捷键": ["shortcut", "key"],
+    "窗口": ["window", "resize"],
+    "应用": ["app", "launch"],
+}
+
+_ASCII_WORD_RE = re.compile(r"[a-z0-9]+")
+_CJK_RUN_RE = re.compile(r"[\u4e00-\u9fff]+")
+
+
+def _tokenize(text: str) -> set:
+    """
+    轻量分词（用于工具相关性打分）
+
+    英文按单词切分（browser_navigate → browser, navigate），
+    中文按双字切分，并根据 TOOL_HINTS 扩展英文关键词
+    """
+    text = text.lower()
+    tokens = set(_ASCII_WORD_RE.findall(text))
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1:
+            tokens.add(run)
+        else:
+            tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    for keyword, hints in TOOL_HINTS.items():
+        if keyword in text:
+            tokens.update(hints)
+    return tokens
 
 
 @dataclass
@@ -40,6 +98,29 @@ class ReActParser:
     ACTION_INPUT_PATTERN = r"Action Input:\s*(\{.*?\})"
     FINAL_ANSWER_PATTERN = r"Final Answer:\s*(.*)"
 
+    # 标准格式快速路径：Thought / Action / Action Input 依次出现，单个正则一次匹配
+    _FAST_RE = re.compile(
+        r"Thought:\s*(.*?)\nAction:\s*(\S+)\nAction Input:\s*(\{.*?\})\s*(?:\n|$)",
+        re.DOTALL
+    )
+
+    _JSON_DECODER = json.JSONDecoder()
+
+    @staticmethod
+    def is_action_complete(response: str) -> bool:
+        """判断响应中的 Action Input 是否已是完整的 JSON 对象（用于流式提前结束）"""
+        action_input_index = response.find("Action Input:")
+        if action_input_index == -1:
+            return False
+        start_idx = response.find("{", action_input_index)
+        if start_idx == -1:
+            return False
+        try:
+            ReActParser._JSON_DECODER.raw_decode(response, start_idx)
+            return True
+        except ValueError:
+            return False
+
     @staticmethod
     def parse(response: str) -> Optional[Dict[str, Any]]:
         """
@@ -65,6 +146,21 @@ class ReActParser:
                     "final_answer": final_match.group(1).strip()
                 }
 
+            # 快速路径：标准格式直接解析，失败时回退到通用解析
+            fast_match = ReActParser._FAST_RE.search(response)
+            if fast_match:
+                try:
+                    action_input = json.loads(fast_match.group(3))
+                    print(f"[调试] 解析到的参数: {action_input}")
+                    return {
+                        "thought": fast_match.group(1).strip(),
+                        "action": fast_match.group(2).strip(),
+                        "action_input": action_input,
+                        "done": False
+                    }
+                except json.JSONDecodeError:
+                    pass
+
             # 提取 Thought
             thought_match = re.search(ReActParser.THOUGHT_PATTERN, response, re.DOTALL)
             thought = thought_match.group(1).strip() if thought_match else ""
@@ -157,9 +253,20 @@ class ReactAgent:
         # 可用工具列表
         self.available_tools: List[Dict[str, Any]] = []
 
+        # 工具关键词索引（available_tools 变化时重建）
+        self._tool_keywords: Dict[str, set] = {}
+        self._tool_keywords_source: Optional[List[Dict[str, Any]]] = None
+
+        # 当前命令相关的工具及系统提示词（每个命令重新筛选，同一命令内各步骤复用）
+        self._selected_tools: Optional[List[Dict[str, Any]]] = None
+        self._system_prompt: Optional[str] = None
+
         # 最大步数（防止死循环）
         self.max_steps = 15
 
+        # 最近失败的 (action, action_input) 哈希（用于检测重复失败的循环）
+        self._failed_action_keys: Deque[int] = deque(maxlen=8)
+
         # 长期记忆（跨会话持久化）
         self.long_term_memory = {
             "summary": None,  # LLM 自动生成的状态总结
@@ -171,6 +278,8 @@ class ReactAgent:
 
         # 执行状态标志（标识是否正在执行任务）
         self.is_executing = False
+        self.idle_event = threading.Event()  # 空闲时置位，供等待任务结束的线程阻塞等待
+        self.idle_event.set()
 
     def start(self) -> bool:
         """启动 Agent（启动 MCP Servers）"""
@@ -229,6 +338,7 @@ class ReactAgent:
 
         # 标记为执行中
         self.is_executing = True
+        self.idle_event.clear()
         self.interrupt_flag = False  # 重置中断标志
 
         try:
@@ -247,6 +357,7 @@ class ReactAgent:
             # 执行完成，清除执行标志
             self.is_executing = False
             self.interrupt_flag = False
+            self.idle_event.set()
 
     async def execute_command_async(self, user_command: str, enable_voice: bool = False) -> Dict:
         """
@@ -265,6 +376,7 @@ class ReactAgent:
 
         # 标记为执行中
         self.is_executing = True
+        self.idle_event.clear()
         self.interrupt_flag = False
 
         try:
@@ -276,6 +388,7 @@ class ReactAgent:
             # 执行完成，清除执行标志
             self.is_executing = False
             self.interrupt_flag = False
+            self.idle_event.set()
 
     def _needs_vision_understanding(self, command: str) -> bool:
         """
@@ -410,46 +523,6 @@ class ReactAgent:
         # 默认窗口截图（节省 Vision API token）
         return "window"
 
-    def _get_foreground_window_rect(self) -> Optional[tuple]:
-        """
-        获取前台窗口坐标（DPI感知）
-
-        Returns:
-            (left, top, right, bottom) 或 None
-        """
-        try:
-            # 设置 DPI 感知
-            try:
-                ctypes.windll.shcore.SetProcessDpiAwareness(2)
-            except:
-                # 可能已经设置过，忽略错误
-                pass
-
-            # 获取前台窗口句柄
-            hwnd = ctypes.windll.user32.GetForegroundWindow()
-            if not hwnd:
-                return None
-
-            # 获取窗口矩形
-            rect = wintypes.RECT()
-            ctypes.windll.user32.GetWindowRect(hwnd, ctypes.byref(rect))
-
-            # 修正：去除边框和阴影（Windows 10/11 典型值）
-            padding = 8
-            bbox = (
-                rect.left + padding,
-                rect.top,
-                rect.right - padding,
-                rect.bottom - padding
-            )
-
-            self.logger.debug(f"窗口坐标: 原始{(rect.left, rect.top, rect.right, rect.bottom)} -> 修正{bbox}")
-            return bbox
-
-        except Exception as e:
-            self.logger.warning(f"获取窗口坐标失败: {e}")
-            return None
-
     def _take_screenshot(self, target: str = "window") -> str:
         """
         智能截图
@@ -470,7 +543,7 @@ class ReactAgent:
 
         if target == "window":
             # 尝试窗口截图
-            bbox = self._get_foreground_window_rect()
+            bbox = foreground_bbox()
             if bbox:
                 self.logger.info(f"使用窗口截图: {bbox}")
                 screenshot = ImageGrab.grab(bbox=bbox)
@@ -501,6 +574,10 @@ class ReactAgent:
         """
         # 重置历史
         self.history = []
+        self._failed_action_keys.clear()
+
+        # 按当前命令筛选相关工具（系统提示词在本命令的各步骤间复用）
+        self._select_tools_for_command(user_command)
 
         # React 循环
         for step in range(self.max_steps):
@@ -515,6 +592,18 @@ class ReactAgent:
                     "interrupted": True
                 }
 
+            # 检查是否陷入失败循环
+            stall_reason = self._detect_stall()
+            if stall_reason:
+                print(f"\n⚠️ {stall_reason}，停止执行")
+                self.logger.warning(stall_reason)
+                return {
+                    "success": False,
+                    "message": stall_reason,
+                    "steps": step,
+                    "stalled": True
+                }
+
             print(f"\n--- 步骤 {step + 1} ---")
             self.logger.info(f"\n--- Step {step + 1} ---")
 
@@ -598,6 +687,10 @@ class ReactAgent:
         """
         # 重置历史
         self.history = []
+        self._failed_action_keys.clear()
+
+        # 按当前命令筛选相关工具（系统提示词在本命令的各步骤间复用）
+        self._select_tools_for_command(user_command)
 
         # React 循环
         for step in range(self.max_steps):
@@ -614,6 +707,20 @@ class ReactAgent:
                     "interrupted": True
                 }
 
+            # 检查是否陷入失败循环
+            stall_reason = self._detect_stall()
+            if stall_reason:
+                print(f"\n⚠️ {stall_reason}，停止执行")
+                self.logger.warning(stall_reason)
+                if enable_voice:
+                    self.tts.speak_async("抱歉，任务未能完成")
+                return {
+                    "success": False,
+                    "message": stall_reason,
+                    "steps": step,
+                    "stalled": True
+                }
+
             print(f"\n--- 步骤 {step + 1} ---")
             self.logger.info(f"\n--- Step {step + 1} ---")
 
@@ -697,6 +804,30 @@ class ReactAgent:
             "steps": self.max_steps
         }
 
+    @staticmethod
+    def _action_key(action: str, action_input: Dict[str, Any]) -> int:
+        """生成动作去重键（参数按键排序后取 CRC32，跨进程稳定）"""
+        payload = json.dumps([action, action_input], sort_keys=True, ensure_ascii=False, default=str)
+        return zlib.crc32(payload.encode("utf-8"))
+
+    def _detect_stall(self) -> Optional[str]:
+        """
+        检测失败循环（连续重复同一失败调用，或 A→B→A 回到之前失败过的调用）
+
+        Returns:
+            停止原因，未陷入循环时返回 None
+        """
+        if not self.history or self.history[-1].success:
+            return None
+
+        last = self.history[-1]
+        key = self._action_key(last.action, last.action_input)
+        if key in self._failed_action_keys:
+            return f"重复执行失败的操作: {last.action}"
+
+        self._failed_action_keys.append(key)
+        return None
+
     def _think(self, user_command: str) -> Optional[Dict[str, Any]]:
         """
         思考：根据用户命令和历史记录，决定下一步动作
@@ -713,7 +844,8 @@ class ReactAgent:
         prompt = self._build_react_prompt(user_command)
 
         try:
-            response = requests.post(
+            # 流式请求：Action Input 完整后即可断开，无需等待后续输出
+            response = http_session.post(
                 f"{self.api_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -726,14 +858,15 @@ class ReactAgent:
                         {"role": "user", "content": prompt}
                     ],
                     "max_tokens": 1500,
-                    "temperature": 0.1
+                    "temperature": 0.1,
+                    "stream": True
                 },
-                timeout=30  # 增加超时时间：15秒 → 30秒
+                timeout=30,  # 增加超时时间：15秒 → 30秒
+                stream=True
             )
 
             if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
+                content = self._read_stream_content(response)
 
                 # 调试：显示 LLM 原始响应
                 print(f"\n[调试] LLM 响应:\n{content}\n")
@@ -752,6 +885,7 @@ class ReactAgent:
 
                 return parsed
             else:
+                response.close()
                 self.logger.error(f"LLM 请求失败: {response.status_code}")
                 print(f"⚠️ LLM 请求失败: {response.status_code}")
                 return None
@@ -771,9 +905,90 @@ class ReactAgent:
             traceback.print_exc()
             return None
 
+    @staticmethod
+    def _read_stream_content(response) -> str:
+        """
+        读取流式（SSE）响应内容
+
+        逐块累积 delta，一旦 Action Input 的 JSON 完整就关闭连接；
+        Final Answer 需要完整文本，读到 [DONE] 为止
+        """
+        content = ""
+        try:
+            for raw_line in response.iter_lines():
+                # 按字节切行后再解码，避免多字节中文被截断
+                line = raw_line.decode("utf-8")
+                if not line.startswith("data:"):
+                    continue
+
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                choices = json.loads(data).get("choices") or []
+                if not choices:
+                    continue
+                delta = (choices[0].get("delta") or {}).get("content") or ""
+                if not delta:
+                    continue
+
+                content += delta
+                if "}" in delta and ReActParser.is_action_complete(content):
+                    break
+        finally:
+            response.close()
+
+        return content
+
+    def _get_tool_keywords(self) -> Dict[str, set]:
+        """获取工具关键词索引（工具列表变化时重建）"""
+        if self._tool_keywords_source is not self.available_tools:
+            self._tool_keywords = {
+                tool.get("name", ""): _tokenize(f"{tool.get('name', '')} {tool.get('description', '')}")
+                for tool in self.available_tools
+            }
+            self._tool_keywords_source = self.available_tools
+        return self._tool_keywords
+
+    def _select_tools_for_command(self, user_command: str):
+        """
+        按相关性筛选当前命令需要注入提示词的工具
+
+        以命令分词与工具关键词的 Jaccard 相似度打分，取前 REACT_TOOL_TOP_K 个，
+        CORE_TOOLS 始终保留。工具数量不超过上限时不做筛选。
+        """
+        self._system_prompt = None
+
+        if len(self.available_tools) <= REACT_TOOL_TOP_K:
+            self._selected_tools = self.available_tools
+            return
+
+        tool_keywords = self._get_tool_keywords()
+        command_tokens = _tokenize(user_command)
+
+        def score(tool):
+            keywords = tool_keywords.get(tool.get("name", ""), set())
+            union = command_tokens | keywords
+            return len(command_tokens & keywords) / len(union) if union else 0.0
+
+        ranked = sorted(self.available_tools, key=score, reverse=True)
+        keep = {tool.get("name", "") for tool in ranked[:REACT_TOOL_TOP_K]} | CORE_TOOLS
+
+        # 保持工具原有顺序
+        self._selected_tools = [
+            tool for tool in self.available_tools if tool.get("name", "") in keep
+        ]
+        self.logger.debug(
+            f"工具筛选: {len(self.available_tools)} → {len(self._selected_tools)} 个"
+        )
+
     def _get_system_prompt(self) -> str:
-        """获取系统提示词"""
-        tool_descriptions = self._format_tool_descriptions()
+        """获取系统提示词（同一命令内复用）"""
+        if self._system_prompt is not None:
+            return self._system_prompt
+
+        tools = self._selected_tools if self._selected_tools is not None else self.available_tools
+        tool_descriptions = self._format_tool_descriptions(tools)
 
         # 临时调试：显示工具描述（只在第一次调用时）
         if not hasattr(self, '_prompt_shown'):
@@ -786,7 +1001,7 @@ class ReactAgent:
             print()
             self._prompt_shown = True
 
-        return f"""你是一个智能助手，同时使用 Windows-MCP 和 Playwright-MCP 工具完成用户任务。
+        self._system_prompt = f"""你是一个智能助手，同时使用 Windows-MCP 和 Playwright-MCP 工具完成用户任务。
 
 按照 ReAct (Reasoning and Acting) 框架思考和行动：
 1. Thought: 分析当前情况，思考下一步
@@ -830,15 +1045,17 @@ Final Answer: [总结结果]
 5. 如果任务不清晰或无法理解，直接返回 Final Answer 说明原因
 6. 最多 15 步必须完成，但应尽快完成任务
 7. 如果连续失败 3 次，立即停止并返回 Final Answer"""
+        return self._system_prompt
 
-    def _format_tool_descriptions(self) -> str:
+    def _format_tool_descriptions(self, tools: Optional[List[Dict[str, Any]]] = None) -> str:
         """格式化工具描述"""
-        if not self.available_tools:
+        if tools is None:
+            tools = self.available_tools
+        if not tools:
             return "暂无可用工具"
 
         descriptions = []
-        # 不再限制数量，显示所有工具
-        for tool in self.available_tools:
+        for tool in tools:
             name = tool.get("name", "")
             desc = tool.get("description", "")
             schema = tool.get("input_schema", {})
@@ -1002,7 +1219,7 @@ Final Answer: [总结结果]
 总结："""
 
             # 调用 LLM 生成总结
-            response = requests.post(
+            response = http_session.post(
                 f"{self.api_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
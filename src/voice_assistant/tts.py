@@ -1,25 +1,590 @@
 """TTS语音播报管理器"""
+import hashlib
+import mmap
+import os
+import queue
+import shutil
+import random
+import re
+import struct
 import threading
 import time
-import wave
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 import pyaudio
 import requests
 
+# 短文本TTS（dashscope，可选依赖）
+try:
+    import dashscope
+    dashscope.base_http_api_url = 'https://dashscope.aliyuncs.com/api/v1'
+except ImportError:
+    dashscope = None
+
+from .http_session import session as _HTTP, json_dumps as _json_dumps, json_loads as _json_loads
 from .config import (
     DASHSCOPE_API_KEY,
     ALIYUN_APPKEY,
     ALIYUN_TTS_URL,
+    ALIYUN_TTS_NOTIFY_URL,
+    ALIYUN_TTS_NOTIFY_PORT,
     TTS_AUDIO_DIR,
     TTS_SHORT_TEXT_LIMIT,
-    TTS_CACHE_TIMEOUT_SHORT,
-    TTS_CACHE_TIMEOUT_LONG,
+    TTS_CACHE_MAX_BYTES,
+    TTS_CACHE_MIN_FREE_RATIO,
+    TTS_CANNED_PHRASES,
 )
 
+# TTS 模型标识（参与缓存键计算）
+SHORT_TTS_MODEL = "qwen3-tts-flash"
+LONG_TTS_MODEL = "aliyun-long-tts"
+
+# 长文本TTS输出格式（采样宽度, 声道数, 采样率），与 _request_long_tts 请求参数一致
+LONG_TTS_FORMAT = (2, 1, 16000)
+
+# Piper 每次写入的帧数（约0.2秒，兼顾打断响应和调用开销）
+PIPER_WRITE_FRAMES = 4096
+
+# 内存PCM缓存：最多条目数、单条最大字节数（约16秒的16kHz单声道音频）
+PCM_CACHE_MAX_ENTRIES = 16
+PCM_CACHE_MAX_ENTRY_BYTES = 512 * 1024
+
+# 异步长文本TTS：每段最大字数、同时进行的任务数
+LONG_TTS_SEGMENT_CHARS = 600
+LONG_TTS_PARALLEL_JOBS = 3
+
+# 同时进行的云端TTS请求数上限
+TTS_MAX_CONCURRENT_REQUESTS = 2
+
+# 未完成下载的临时文件超过该时间（秒）视为残留，清理缓存时删除
+PARTIAL_FILE_MAX_AGE = 600
+
+# 播放结束时补写的静音时长（秒），避免尾音被截断
+TAIL_SILENCE_SECONDS = 0.05
+
+
+def _silence(wav_format, seconds=TAIL_SILENCE_SECONDS):
+    """生成指定格式的静音数据"""
+    sampwidth, channels, rate = wav_format
+    return b"\x00" * (int(rate * seconds) * sampwidth * channels)
+
+# 采样宽度（字节）-> PyAudio 采样格式（8位WAV为无符号，与 get_format_from_width 一致）
+_WIDTH2FMT = {1: pyaudio.paUInt8, 2: pyaudio.paInt16, 3: pyaudio.paInt24, 4: pyaudio.paInt32}
+
+# 输出流缓冲帧数（16kHz 下约 128ms，降低GIL争用导致的欠载）
+# PyAudio 的阻塞式 write() 在C层等待时会释放GIL，缓冲足够大即可避免其他线程造成的卡顿
+PLAYBACK_FRAMES_PER_BUFFER = 2048
+
+# 长文本TTS轮询间隔（指数退避）
+POLL_INITIAL_DELAY = 0.3
+POLL_MAX_DELAY = 2.0
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.2  # 间隔随机浮动 ±20%，避免多个任务同步轮询
+POLL_MAX_INFLIGHT = 2  # 同时进行的查询请求数上限
+
+# 句末标点（保留在句子末尾）
+_SENTENCE_END_RE = re.compile(r"(?<=[。！？；!?;\n])")
+
+
+
+def _tts_cache_path(audio_dir, text, voice, long=False):
+    """
+    计算TTS缓存文件路径（内容哈希）
+
+    相同的 (voice, model, text) 总是对应同一个文件，命中时无需再次请求API
+    """
+    model = LONG_TTS_MODEL if long else SHORT_TTS_MODEL
+    digest = hashlib.sha256(f"{voice}|{model}|{text}".encode("utf-8")).hexdigest()[:20]
+    prefix = "tts_long_" if long else "tts_"
+    return audio_dir / f"{prefix}{digest}.wav"
+
+
+def _part_path(path):
+    """
+    临时文件路径（带进程号和线程号）
+
+    同一文本被并发合成时各自写入不同的临时文件，最后 os.replace 原子覆盖，
+    读取方只会看到完整的缓存文件
+    """
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+
+
+def _curate_tts_cache(audio_dir):
+    """
+    清理TTS缓存目录（LRU，按修改时间删除最旧的文件）
+
+    直到目录总大小不超过 TTS_CACHE_MAX_BYTES；磁盘剩余空间低于
+    TTS_CACHE_MIN_FREE_RATIO 时，仅在删除缓存足以补足缺口的情况下才额外淘汰
+    （否则清空缓存也无济于事，反而丢掉常用短语）；同时删除中断残留的 .part 文件
+    """
+    try:
+        now = time.time()
+        for part in audio_dir.glob("tts_*.part"):
+            if now - part.stat().st_mtime > PARTIAL_FILE_MAX_AGE:
+                _unlink_quietly(part)
+
+        entries = [(path, path.stat()) for path in audio_dir.glob("tts_*.wav")]
+        usage = shutil.disk_usage(audio_dir)
+    except OSError:
+        return
+
+    total = sum(st.st_size for _, st in entries)
+    budget = TTS_CACHE_MAX_BYTES
+    shortfall = usage.total * TTS_CACHE_MIN_FREE_RATIO - usage.free
+    if 0 < shortfall <= total:
+        budget = min(budget, total - shortfall)
+    if total <= budget:
+        return
+
+    entries.sort(key=lambda entry: entry[1].st_mtime)
+    for path, st in entries:
+        if total <= budget:
+            break
+        _unlink_quietly(path)
+        total -= st.st_size
+
+
+def _touch(filepath):
+    """刷新文件修改时间（用于LRU淘汰）"""
+    try:
+        filepath.touch()
+    except OSError:
+        pass
+
+
+def _tee_wav_response(response, cache_path, play_pcm, persist=None):
+    """
+    边下载边播放WAV，播放完成后写入缓存
+
+    下载的数据先保存在内存中，播放期间不做任何磁盘I/O；完整播放后短音频
+    直接放入内存PCM缓存，再将文件原子写入磁盘缓存。被打断或下载失败时丢弃
+
+    Args:
+        response: requests 响应（stream=True）
+        cache_path: 缓存文件路径
+        play_pcm: 播放函数 play_pcm(数据块生成器, 音频格式) -> 是否完整播放
+        persist: 提交后台任务的函数 persist(fn, *args)（可选，默认在当前线程写盘）
+
+    Returns:
+        bool: 是否完整播放并缓存
+    """
+    data = bytearray()
+    try:
+        chunks = response.iter_content(chunk_size=4096)
+
+        # 读取到 data 块为止，解析出音频格式
+        header = None
+        for chunk in chunks:
+            data += chunk
+            header = _parse_wav_header(data)
+            if header:
+                break
+        if header is None:
+            raise ValueError("WAV头不完整")
+
+        wav_format, data_offset = header
+        frame_bytes = wav_format[0] * wav_format[1]
+
+        def pcm():
+            # 网络分块不一定按帧对齐，不足一帧的尾部留到下一块
+            pending = bytes(data[data_offset:])
+            for chunk in chunks:
+                data.extend(chunk)
+                pending += chunk
+                usable = len(pending) - len(pending) % frame_bytes
+                if usable:
+                    yield pending[:usable]
+                    pending = pending[usable:]
+            if pending:
+                yield pending
+
+        if not play_pcm(pcm(), wav_format):
+            return False
+    except Exception as e:
+        print(f"流式播放失败: {e}")
+        return False
+
+    if len(data) - data_offset <= PCM_CACHE_MAX_ENTRY_BYTES:
+        _pcm_cache.put(str(cache_path), (wav_format, bytes(data[data_offset:])))
+    if persist is None:
+        _write_cache_file(cache_path, data)
+    else:
+        persist(_write_cache_file, cache_path, data)
+    return True
+
+
+def _write_cache_file(cache_path, data):
+    """将音频数据原子写入缓存文件（先写 .part 再替换）"""
+    part_path = _part_path(cache_path)
+    try:
+        with open(part_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(part_path, cache_path)
+    except OSError as e:
+        print(f"写入TTS缓存失败: {e}")
+        _unlink_quietly(part_path)
+
+
+def _download_to_file(url, audio_file, timeout=10):
+    """
+    分块下载音频到文件（先写 .part 再原子替换）
+
+    按 64KB 分块写盘，内存占用与文件大小无关
+
+    Returns:
+        bool: 是否下载成功
+    """
+    part_path = _part_path(audio_file)
+    try:
+        with _HTTP.get(url, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                print(f"音频下载失败: HTTP {response.status_code}")
+                return False
+            with open(part_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    f.write(chunk)
+        os.replace(part_path, audio_file)
+        return True
+    except (requests.RequestException, OSError) as e:
+        print(f"音频下载失败: {e}")
+        _unlink_quietly(part_path)
+        return False
+
+
+def _unlink_quietly(filepath):
+    """删除文件，忽略错误"""
+    try:
+        if filepath.exists():
+            filepath.unlink()
+    except:
+        pass
+
+
+class _PCMCache:
+    """解码后PCM数据的内存LRU缓存（线程安全）"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key, item):
+        with self._lock:
+            self._items[key] = item
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+# 常用短提示音的PCM缓存：命中时无需任何文件I/O
+_pcm_cache = _PCMCache(PCM_CACHE_MAX_ENTRIES)
+
+
+def _iter_chunks(pcm, chunk_bytes):
+    """按 chunk_bytes 切分PCM数据（memoryview 切片，零拷贝）"""
+    view = memoryview(pcm)
+    return (view[i:i + chunk_bytes] for i in range(0, len(view), chunk_bytes))
+
+
+@contextmanager
+def _mapped_wav(audio_file):
+    """
+    以 mmap 方式打开WAV文件
+
+    Yields:
+        ((采样宽度, 声道数, 采样率), PCM数据的 memoryview)
+    """
+    with open(audio_file, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header = _parse_wav_header(mm)
+            if header is None:
+                raise ValueError("WAV头不完整")
+            wav_format, data_offset = header
+
+            # 流式写入的文件 data 块长度可能不准确，以实际文件大小为上限
+            data_size = struct.unpack_from("<I", mm, data_offset - 4)[0]
+            data_end = min(data_offset + data_size, len(mm))
+
+            pcm = memoryview(mm)[data_offset:data_end]
+            try:
+                yield wav_format, pcm
+            finally:
+                pcm.release()
+        finally:
+            try:
+                mm.close()
+            except BufferError:
+                pass  # 调用方仍持有切片，映射在切片释放后自动回收
+
+
+def _load_wav(audio_file):
+    """
+    读取短音频的格式和PCM数据（带内存LRU缓存）
+
+    Returns:
+        ((采样宽度, 声道数, 采样率), PCM数据)；音频超过 PCM_CACHE_MAX_ENTRY_BYTES 时返回 None
+    """
+    key = str(audio_file)
+    cached = _pcm_cache.get(key)
+    if cached is None:
+        with _mapped_wav(audio_file) as (wav_format, pcm):
+            if len(pcm) > PCM_CACHE_MAX_ENTRY_BYTES:
+                return None
+            cached = (wav_format, bytes(pcm))
+        _pcm_cache.put(key, cached)
+    return cached
+
+
+@contextmanager
+def _wav_chunks(audio_file, chunk_frames=1024):
+    """
+    打开WAV文件，产出音频格式和PCM数据块
+
+    短音频（不超过 PCM_CACHE_MAX_ENTRY_BYTES）读入内存LRU缓存，再次播放时
+    不再读取文件；长音频通过 mmap 按 memoryview 切片读取
+
+    Yields:
+        ((采样宽度, 声道数, 采样率), 数据块生成器)
+    """
+    cached = _load_wav(audio_file)
+    if cached is None:
+        with _mapped_wav(audio_file) as (wav_format, pcm):
+            chunks = _iter_chunks(pcm, chunk_frames * wav_format[0] * wav_format[1])
+            try:
+                yield wav_format, chunks
+            finally:
+                chunks.close()
+        return
+
+    wav_format, pcm = cached
+    yield wav_format, _iter_chunks(pcm, chunk_frames * wav_format[0] * wav_format[1])
+
+
+def _split_sentences(text, limit=TTS_SHORT_TEXT_LIMIT, first_alone=False):
+    """
+    按句末标点切分文本，并贪心合并为不超过 limit 字的片段
+
+    Args:
+        text: 原始文本
+        limit: 每段最大字数（超长的单句按字数硬切）
+        first_alone: 首句单独成段（首段合成更快，尽早开始播放）
+
+    Returns:
+        list: 文本片段
+    """
+    pieces = [p for p in _SENTENCE_END_RE.split(text) if p.strip()]
+
+    segments = []
+    current = ""
+    for i, piece in enumerate(pieces):
+        while len(piece) > limit:
+            if current:
+                segments.append(current)
+                current = ""
+            segments.append(piece[:limit])
+            piece = piece[limit:]
+        if current and len(current) + len(piece) > limit:
+            segments.append(current)
+            current = piece
+        else:
+            current += piece
+        if first_alone and i == 0 and current:
+            segments.append(current)
+            current = ""
+    if current:
+        segments.append(current)
+
+    return [seg.strip() for seg in segments if seg.strip()]
+
+
+# 标准44字节WAV头：RIFF + fmt(16字节) + data
+_CANONICAL_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def _parse_wav_header(buf):
+    """
+    解析WAV头（逐块遍历RIFF，兼容 LIST 等附加块）
+
+    Args:
+        buf: 已接收的字节
+
+    Returns:
+        ((采样宽度, 声道数, 采样率), data块起始偏移)，数据不足时返回 None
+
+    Raises:
+        ValueError: 不是有效的WAV数据
+    """
+    # 快速路径：TTS接口输出的都是标准44字节头，一次解包即可
+    if len(buf) >= _CANONICAL_WAV_HEADER.size:
+        (riff, _, wave_id, fmt_id, fmt_size, _, channels, rate,
+         _, _, bits, data_id, _) = _CANONICAL_WAV_HEADER.unpack_from(buf)
+        if (riff, wave_id, fmt_id, fmt_size, data_id) == (b"RIFF", b"WAVE", b"fmt ", 16, b"data"):
+            return ((bits + 7) // 8, channels, rate), _CANONICAL_WAV_HEADER.size
+
+    if len(buf) < 12:
+        return None
+    if buf[:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise ValueError("不是有效的WAV数据")
+
+    wav_format = None
+    pos = 12
+    while pos + 8 <= len(buf):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", buf, pos)
+        body = pos + 8
+        if chunk_id == b"data":
+            if wav_format is None:
+                raise ValueError("WAV缺少fmt块")
+            return wav_format, body
+        if body + chunk_size > len(buf):
+            return None
+        if chunk_id == b"fmt ":
+            _, channels, rate, _, _, bits = struct.unpack_from("<HHIIHH", buf, body)
+            wav_format = ((bits + 7) // 8, channels, rate)
+        pos = body + chunk_size + (chunk_size & 1)  # 块按偶数字节对齐
+    return None
+
+
+class _TTSNotifyServer:
+    """
+    长文本TTS完成回调接收服务
+
+    在本地端口运行HTTP服务，接收服务端 POST 的任务结果；需通过反向隧道
+    将 ALIYUN_TTS_NOTIFY_URL 转发到该端口
+    """
+
+    def __init__(self, port):
+        self._futures = {}
+        self._lock = threading.Lock()
+
+        notify = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    result = _json_loads(self.rfile.read(length))
+                except ValueError:
+                    result = None
+                self.send_response(200)
+                self.end_headers()
+                if isinstance(result, dict):
+                    notify._resolve(result)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        threading.Thread(target=self._httpd.serve_forever, name="tts-notify", daemon=True).start()
+
+    def register(self, task_id):
+        """登记任务，返回在回调到达时完成的 Future（结果为音频地址，失败为 None）"""
+        with self._lock:
+            return self._futures.setdefault(task_id, Future())
+
+    def discard(self, task_id):
+        """取消登记"""
+        with self._lock:
+            self._futures.pop(task_id, None)
+
+    def _resolve(self, result):
+        """处理回调内容"""
+        data = result.get("data") or result
+        with self._lock:
+            future = self._futures.get(data.get("task_id"))
+        if future is None or future.done():
+            return
+
+        if result.get("error_code", 20000000) != 20000000:
+            print(f"TTS回调错误: {result.get('error_message')}")
+            future.set_result(None)
+        else:
+            future.set_result(data.get("audio_address"))
+
+    def close(self):
+        """停止服务"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
 
-class TTSManager:
+
+class _PCMPlayer:
+    """
+    PyAudio PCM 播放公共逻辑（TTSManager 与 TTSManagerStreaming 共用）
+
+    子类实现 _play_pcm(chunks, wav_format)：负责获取/释放输出流、维护
+    is_playing / should_stop / current_stream，并调用 _write_pcm 写入数据
+    """
+
+    def _write_pcm(self, stream, chunks, wav_format):
+        """
+        将PCM数据块写入输出流（检查 should_stop 以便快速打断）
+
+        Args:
+            stream: 输出流
+            chunks: 可迭代的PCM字节块（长度不必按帧对齐）
+            wav_format: 音频格式 (采样宽度, 声道数, 采样率)
+
+        Returns:
+            bool: 是否完整播放（未被打断）
+        """
+        # PyAudio 按整帧写入，不足一帧的尾部留到下一块
+        frame_bytes = wav_format[0] * wav_format[1]
+        pending = b""
+        for data in chunks:
+            if self.should_stop:  # 检查打断标志
+                print("   [TTS已打断]")
+                return False
+            if pending:
+                data = pending + data
+            usable = len(data) - len(data) % frame_bytes
+            if usable:
+                stream.write(data[:usable])
+            pending = bytes(data[usable:])
+
+        if self.should_stop:
+            print("   [TTS已打断]")
+            return False
+
+        # 补写一小段静音，避免结尾被截断
+        stream.write(_silence(wav_format))
+        return True
+
+    def _play_audio_file(self, audio_file, chunk_frames=1024):
+        """
+        使用PyAudio直接播放音频文件
+
+        短音频走内存PCM缓存；长音频通过 mmap 映射，按 memoryview 切片直接写入音频流
+        """
+        try:
+            with _wav_chunks(audio_file, chunk_frames) as (wav_format, chunks):
+                self._play_pcm(chunks, wav_format)
+        except Exception as e:
+            print(f"播放音频失败: {e}")
+
+
+class TTSManager(_PCMPlayer):
     """阿里云TTS语音播报管理器 - 支持长文本"""
 
+    # 短文本音色 -> 长文本TTS音色
+    VOICE_MAP = {
+        "Cherry": "xiaoyun",
+        "xiaoyun": "xiaoyun",
+        "siyue": "siyue",
+        "xiaogang": "xiaogang"
+    }
+
     def __init__(self, api_key=None, appkey=None):
         self.api_key = api_key or DASHSCOPE_API_KEY
         self.appkey = appkey or ALIYUN_APPKEY
@@ -30,43 +595,163 @@ class TTSManager:
         self.current_stream = None  # 当前播放的音频流
 
         # 短文本TTS（dashscope，限制300字）
-        try:
-            import dashscope
+        self.dashscope = dashscope
+        if dashscope:
             dashscope.api_key = self.api_key
-            dashscope.base_http_api_url = 'https://dashscope.aliyuncs.com/api/v1'
-            self.dashscope = dashscope
-        except ImportError:
+        else:
             print("⚠️  需要安装 dashscope: pip install dashscope")
-            self.dashscope = None
 
         self.p = pyaudio.PyAudio()
 
-    def _play_audio_file(self, audio_file):
-        """使用PyAudio直接播放音频文件"""
-        stream = None
+        # 下载音频与预打开音频流并行执行
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts-io")
+
+        # 长文本TTS任务并行提交/轮询
+        self._long_pool = ThreadPoolExecutor(max_workers=LONG_TTS_PARALLEL_JOBS, thread_name_prefix="tts-long")
+
+        # 长文本TTS完成回调（配置 ALIYUN_TTS_NOTIFY_URL 时启用，否则仅轮询）
+        self._notify = None
+        if ALIYUN_TTS_NOTIFY_URL:
+            try:
+                self._notify = _TTSNotifyServer(ALIYUN_TTS_NOTIFY_PORT)
+            except OSError as e:
+                print(f"⚠️  TTS回调服务启动失败，使用轮询: {e}")
+
+        # 限制并发的云端合成请求
+        self._api_sem = threading.BoundedSemaphore(TTS_MAX_CONCURRENT_REQUESTS)
+
+        # 已提交、尚未完成的分段合成任务（打断时取消未开始的任务）
+        self._synth_futures = set()
+        self._synth_lock = threading.Lock()
+
+        # speak_async 使用的合成线程池（避免每次调用新建线程）
+        self._speak_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-speak")
+
+        # 常用短语预合成（后台进行，完成后直接播放本地文件）
+        self._canned = {}
+        if self.dashscope:
+            self._speak_pool.submit(self._warm_canned_phrases)
+
+        # 常驻播放线程：所有播放任务按顺序在同一线程执行
+        self._play_queue = queue.Queue()
+        threading.Thread(target=self._playback_loop, name="tts-play", daemon=True).start()
+
+    def _cache_path(self, text, voice, long=False):
+        """计算缓存文件路径（内容哈希）"""
+        return _tts_cache_path(self.audio_dir, text, voice, long)
+
+    def _curate_cache(self):
+        """清理缓存目录（LRU）"""
+        _curate_tts_cache(self.audio_dir)
+
+    def _warm_canned_phrases(self, voice="Cherry"):
+        """预合成 TTS_CANNED_PHRASES 中的常用短语并载入内存PCM缓存"""
+        for phrase in TTS_CANNED_PHRASES:
+            audio_file = self._cache_path(phrase, voice)
+            if not audio_file.exists():
+                audio_url = self._synthesize_short(phrase, voice)
+                if not audio_url or not _download_to_file(audio_url, audio_file):
+                    continue
+            try:
+                # 预先解析并载入内存，首次播放即无需读文件
+                _load_wav(audio_file)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 预载提示音失败: {e}")
+                continue
+            self._canned[phrase] = audio_file
+
+    def _play_cached(self, audio_file, wait):
+        """播放缓存文件"""
+        self._touch_cached(audio_file)
+        self._play(audio_file, wait)
+
+    def _touch_cached(self, audio_file):
+        """刷新缓存文件修改时间（用于LRU淘汰）"""
+        print("   命中TTS缓存")
+        _touch(audio_file)
+
+    def _play(self, audio_file, wait):
+        """播放音频文件（wait=False 时在后台线程播放）"""
+        self._dispatch(self._play_audio_file, (audio_file,), wait)
+
+    def _dispatch(self, target, args, wait):
+        """
+        提交播放任务到播放线程
+
+        Args:
+            target: 任务函数
+            args: 参数
+            wait: 是否等待任务完成
+
+        Returns:
+            threading.Event: 任务完成事件
+        """
+        done = threading.Event()
+        self._play_queue.put((target, args, done))
+        if wait:
+            done.wait()
+        return done
+
+    def _playback_loop(self):
+        """播放线程主循环"""
+        while True:
+            target, args, done = self._play_queue.get()
+            if target is None:
+                done.set()
+                break
+            try:
+                target(*args)
+            except Exception as e:
+                print(f"播放任务失败: {e}")
+            finally:
+                done.set()
+
+    def _drain_play_queue(self):
+        """丢弃尚未开始的播放任务"""
+        while True:
+            try:
+                _, _, done = self._play_queue.get_nowait()
+            except queue.Empty:
+                break
+            done.set()
+
+    def _open_output_stream(self, sampwidth, channels, rate):
+        """打开PyAudio输出流"""
+        return self.p.open(
+            format=_WIDTH2FMT[sampwidth],
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=PLAYBACK_FRAMES_PER_BUFFER
+        )
+
+    def _play_pcm(self, chunks, wav_format, stream=None, stream_format=None):
+        """
+        播放PCM数据块
+
+        Args:
+            chunks: 可迭代的PCM字节块（长度不必按帧对齐）
+            wav_format: 音频格式 (采样宽度, 声道数, 采样率)
+            stream: 预先打开的输出流（可选，格式不符时会关闭并重新打开）
+            stream_format: 预打开流的格式
+
+        Returns:
+            bool: 是否完整播放（未被打断且未出错）
+        """
+        completed = False
         try:
             self.is_playing = True
             self.should_stop = False
 
-            with wave.open(str(audio_file), 'rb') as wf:
-                stream = self.p.open(
-                    format=self.p.get_format_from_width(wf.getsampwidth()),
-                    channels=wf.getnchannels(),
-                    rate=wf.getframerate(),
-                    output=True
-                )
-                self.current_stream = stream  # 保存引用以便打断
-
-                chunk_size = 1024
-                data = wf.readframes(chunk_size)
-                while data and not self.should_stop:  # 检查打断标志
-                    stream.write(data)
-                    data = wf.readframes(chunk_size)
-
-            if self.should_stop:
-                print("   [TTS已打断]")
+            if stream is not None and stream_format != wav_format:
+                stream.close()
+                stream = None
+            if stream is None:
+                stream = self._open_output_stream(*wav_format)
+            self.current_stream = stream  # 保存引用以便打断
 
-            time.sleep(0.1)  # 缩短延迟
+            # 写完后 stop_stream() 会阻塞到缓冲区播放完毕
+            completed = self._write_pcm(stream, chunks, wav_format)
         except Exception as e:
             if "Broken pipe" not in str(e):  # 忽略打断时的管道错误
                 print(f"播放音频失败: {e}")
@@ -80,6 +765,66 @@ class TTSManager:
             self.current_stream = None
             self.is_playing = False
             self.should_stop = False
+        return completed
+
+    def _stream_play_wav(self, response, cache_path, stream=None, stream_format=None):
+        """
+        边下载边播放WAV，播放完成后在后台写入缓存文件
+
+        Returns:
+            bool: 是否完整播放并缓存
+        """
+        def play(chunks, wav_format):
+            nonlocal stream
+            player_stream, stream = stream, None  # 流的所有权交给 _play_pcm
+            return self._play_pcm(chunks, wav_format, player_stream, stream_format)
+
+        try:
+            return _tee_wav_response(response, cache_path, play, persist=self._executor.submit)
+        finally:
+            if stream:
+                try:
+                    stream.close()
+                except:
+                    pass
+
+    def _fetch_and_play(self, url, audio_file, stream_future=None, stream_format=None, timeout=30):
+        """
+        下载音频并边下边播
+
+        Args:
+            url: 音频地址
+            audio_file: 缓存文件路径
+            stream_future: 正在预打开的输出流（Future，可选）
+            stream_format: 预打开流的格式
+        """
+        stream = None
+        try:
+            response = _HTTP.get(url, stream=True, timeout=timeout)
+        except requests.RequestException as e:
+            print(f"音频下载失败: {e}")
+            response = None
+
+        if stream_future is not None:
+            try:
+                stream = stream_future.result()
+            except Exception as e:
+                print(f"⚠️  预打开音频流失败: {e}")
+
+        if response is None:
+            if stream:
+                stream.close()
+            return
+
+        with response:
+            if response.status_code != 200:
+                print(f"音频下载失败: HTTP {response.status_code}")
+                if stream:
+                    stream.close()
+                return
+
+            if self._stream_play_wav(response, audio_file, stream, stream_format):
+                self._executor.submit(self._curate_cache)
 
     def speak(self, text, voice="Cherry", wait=True):
         """智能语音播报：自动选择短文本或长文本TTS"""
@@ -87,6 +832,13 @@ class TTSManager:
             return
 
         text = text.strip()
+
+        # 常用短语：直接播放预合成的音频
+        canned = self._canned.get(text) if voice == "Cherry" else None
+        if canned and canned.exists():
+            self._play(canned, wait)
+            return
+
         text_length = len(text)
 
         print(f"📝 文本长度: {text_length} 字符")
@@ -96,60 +848,136 @@ class TTSManager:
             print("   使用短文本TTS（dashscope）")
             self._speak_short(text, voice, wait)
         else:
-            print("   文本较长，使用长文本TTS（异步接口）")
+            print("   文本较长，使用长文本TTS")
             self._speak_long(text, voice, wait)
 
     def _speak_short(self, text, voice, wait):
         """短文本TTS"""
+        audio_file = self._cache_path(text, voice)
+        if audio_file.exists():
+            self._play_cached(audio_file, wait)
+            return
+
         if not self.dashscope:
             print("⚠️  Dashscope未初始化")
             return
 
+        audio_url = self._synthesize_short(text, voice)
+        if audio_url:
+            self._dispatch(self._fetch_and_play, (audio_url, audio_file, None, None, 10), wait)
+
+    def _synthesize_short(self, text, voice):
+        """
+        调用短文本TTS合成
+
+        Returns:
+            str: 音频地址，失败返回 None
+        """
         try:
-            response = self.dashscope.MultiModalConversation.call(
-                model="qwen3-tts-flash",
-                api_key=self.api_key,
-                text=text,
-                voice=voice,
-                language_type="Chinese",
-                stream=False
-            )
+            with self._api_sem:
+                response = self.dashscope.MultiModalConversation.call(
+                    model=SHORT_TTS_MODEL,
+                    api_key=self.api_key,
+                    text=text,
+                    voice=voice,
+                    language_type="Chinese",
+                    stream=False
+                )
 
             if response.status_code == 200:
-                audio_url = response.output.audio.url
-                audio_response = requests.get(audio_url, timeout=10)
-                if audio_response.status_code == 200:
-                    audio_file = self.audio_dir / f"tts_{int(time.time())}.wav"
-                    with open(audio_file, 'wb') as f:
-                        f.write(audio_response.content)
-
-                    if wait:
-                        self._play_audio_file(audio_file)
-                    else:
-                        threading.Thread(
-                            target=self._play_audio_file,
-                            args=(audio_file,),
-                            daemon=True
-                        ).start()
-
-                    threading.Timer(
-                        TTS_CACHE_TIMEOUT_SHORT,
-                        lambda: self._delete_file(audio_file)
-                    ).start()
-            else:
-                print(f"TTS错误: {response.status_code} - {response.message}")
+                return response.output.audio.url
+            print(f"TTS错误: {response.status_code} - {response.message}")
 
         except Exception as e:
             print(f"短文本TTS失败: {e}")
+        return None
+
+    def _play_segment(self, url_future, audio_file, long=False):
+        """等待片段合成完成后下载播放（在播放线程执行）"""
+        if url_future.cancelled():
+            return
+        audio_url = url_future.result()
+        if not audio_url:
+            return
+
+        if long:
+            # 长文本接口输出格式已知：下载的同时预打开输出流
+            stream_future = self._executor.submit(self._open_output_stream, *LONG_TTS_FORMAT)
+            self._fetch_and_play(audio_url, audio_file, stream_future, LONG_TTS_FORMAT)
+        else:
+            self._fetch_and_play(audio_url, audio_file, None, None, 10)
 
     def _speak_long(self, text, voice, wait):
-        """长文本TTS（异步接口）"""
+        """
+        长文本TTS
+
+        按句切分后流水线合成：后续片段在前一段播放时合成。首句单独成段，
+        首段音频只需一句话的合成延迟。优先使用短文本TTS；dashscope 不可用时
+        回退到异步长文本接口（多个片段并行提交）
+        """
+        if self.dashscope:
+            segments = _split_sentences(text, first_alone=True)
+            print(f"   分为 {len(segments)} 段流水线合成")
+            self._speak_pipelined(segments, voice, wait)
+        else:
+            segments = _split_sentences(text, LONG_TTS_SEGMENT_CHARS, first_alone=True)
+            print(f"   分为 {len(segments)} 段并行提交长文本TTS")
+            self._speak_pipelined(segments, voice, wait, long=True)
+
+    def _speak_pipelined(self, segments, voice, wait, long=False):
+        """
+        分段合成并按顺序播放
+
+        Args:
+            segments: 文本片段
+            voice: 音色
+            wait: 是否等待全部播放完成
+            long: 是否使用异步长文本接口
+        """
+        synthesize = self._synthesize_long if long else self._synthesize_short
+        pool = self._long_pool if long else self._executor
+
+        done = None
+        for segment in segments:
+            audio_file = self._cache_path(segment, voice, long)
+            if audio_file.exists():
+                self._touch_cached(audio_file)
+                done = self._dispatch(self._play_audio_file, (audio_file,), wait=False)
+            else:
+                url_future = pool.submit(synthesize, segment, voice)
+                with self._synth_lock:
+                    self._synth_futures.add(url_future)
+                url_future.add_done_callback(self._forget_synth_future)
+                done = self._dispatch(self._play_segment, (url_future, audio_file, long), wait=False)
+
+        if wait and done:
+            done.wait()
+
+    def _forget_synth_future(self, future):
+        """合成任务结束（完成或被取消）后移出跟踪集合"""
+        with self._synth_lock:
+            self._synth_futures.discard(future)
+
+    def _cancel_pending_synthesis(self):
+        """取消尚未开始的分段合成任务（已在进行的请求无法中途取消）"""
+        with self._synth_lock:
+            futures = list(self._synth_futures)
+        for future in futures:
+            future.cancel()
+
+    def _synthesize_long(self, text, voice):
+        """
+        调用异步长文本TTS合成（提交任务并轮询结果）
+
+        Returns:
+            str: 音频地址，失败返回 None
+        """
         try:
             # 1. 发起合成请求
             task_id = self._request_long_tts(text, voice)
             if not task_id:
                 print("❌ 长文本TTS请求失败")
-                return
+                return None
 
             print(f"✓ 任务已提交，task_id: {task_id}")
 
@@ -157,45 +985,20 @@ class TTSManager:
             audio_url = self._poll_tts_result(task_id)
             if not audio_url:
                 print("❌ 获取TTS结果失败")
-                return
+                return None
 
             print(f"✓ 音频已生成: {audio_url}")
-
-            # 3. 下载并播放
-            audio_response = requests.get(audio_url, timeout=30)
-            if audio_response.status_code == 200:
-                audio_file = self.audio_dir / f"tts_long_{int(time.time())}.wav"
-                with open(audio_file, 'wb') as f:
-                    f.write(audio_response.content)
-
-                if wait:
-                    self._play_audio_file(audio_file)
-                else:
-                    threading.Thread(
-                        target=self._play_audio_file,
-                        args=(audio_file,),
-                        daemon=True
-                    ).start()
-
-                threading.Timer(
-                    TTS_CACHE_TIMEOUT_LONG,
-                    lambda: self._delete_file(audio_file)
-                ).start()
+            return audio_url
 
         except Exception as e:
             print(f"长文本TTS失败: {e}")
             import traceback
             traceback.print_exc()
+            return None
 
     def _request_long_tts(self, text, voice):
         """发起长文本TTS请求"""
-        voice_map = {
-            "Cherry": "xiaoyun",
-            "xiaoyun": "xiaoyun",
-            "siyue": "siyue",
-            "xiaogang": "xiaogang"
-        }
-        tts_voice = voice_map.get(voice, "xiaoyun")
+        tts_voice = self.VOICE_MAP.get(voice, "xiaoyun")
 
         body = {
             "header": {
@@ -203,7 +1006,7 @@ class TTSManager:
                 "token": self.api_key
             },
             "payload": {
-                "enable_notify": False,
+                "enable_notify": self._notify is not None,
                 "tts_request": {
                     "text": text,
                     "voice": tts_voice,
@@ -217,15 +1020,19 @@ class TTSManager:
             }
         }
 
-        response = requests.post(
-            ALIYUN_TTS_URL,
-            headers={"Content-Type": "application/json"},
-            json=body,
-            timeout=15
-        )
+        if self._notify is not None:
+            body["payload"]["notify_url"] = ALIYUN_TTS_NOTIFY_URL
+
+        with self._api_sem:
+            response = _HTTP.post(
+                ALIYUN_TTS_URL,
+                headers={"Content-Type": "application/json"},
+                data=_json_dumps(body),
+                timeout=15
+            )
 
         if response.status_code == 200:
-            result = response.json()
+            result = _json_loads(response.content)
             if result.get("error_code") == 20000000:
                 return result["data"]["task_id"]
             else:
@@ -236,46 +1043,96 @@ class TTSManager:
         return None
 
     def _poll_tts_result(self, task_id, max_wait=60):
-        """轮询获取TTS结果"""
+        """
+        轮询获取TTS结果（指数退避 + 抖动，允许请求重叠）
+
+        首次间隔 0.3 秒，每次乘以 1.5，上限 2 秒（±20% 抖动）；按间隔发起下一次查询时
+        不等待上一次返回（最多 POLL_MAX_INFLIGHT 个并发），网络往返与等待重叠。
+        业务错误或 4xx 立即结束，5xx/429 及网络异常视为暂时错误继续重试（直到超时）。
+        启用完成回调时，回调到达即返回，轮询仅以最大间隔兜底（回调地址不可达时仍能拿到结果）
+        """
         url = f"{ALIYUN_TTS_URL}?appkey={self.appkey}&task_id={task_id}&token={self.api_key}"
+        notified = self._notify.register(task_id) if self._notify else None
 
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            try:
-                response = requests.get(url, timeout=10)
-                if response.status_code == 200:
-                    result = response.json()
+        delay = POLL_MAX_DELAY if notified else POLL_INITIAL_DELAY
+        deadline = time.monotonic() + max_wait
+        next_poll = time.monotonic() + (delay if notified else 0)
+        inflight = set()
+        try:
+            while time.monotonic() < deadline:
+                if time.monotonic() >= next_poll and len(inflight) < POLL_MAX_INFLIGHT:
+                    inflight.add(self._executor.submit(self._poll_once, url))
+                    next_poll = time.monotonic() + delay * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+                    delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
+
+                # 并发查询已满时只等待进行中的查询（或回调）完成，不按轮询间隔空转
+                if len(inflight) >= POLL_MAX_INFLIGHT:
+                    timeout = max(0.0, deadline - time.monotonic())
+                else:
+                    timeout = max(0.0, min(next_poll, deadline) - time.monotonic())
+                waiting = inflight | {notified} if notified else inflight
+                if not waiting:
+                    time.sleep(timeout)
+                    continue
+
+                done, _ = wait(waiting, timeout=timeout, return_when=FIRST_COMPLETED)
+                if notified in done:
+                    return notified.result()
+
+                inflight -= done
+                for future in done:
+                    status, audio_address = future.result()
+                    if status == "done":
+                        return audio_address
+                    if status == "error":
+                        return None
+                    print("   合成中，请稍候...")
+        finally:
+            if notified:
+                self._notify.discard(task_id)
 
-                    if result.get("error_code") == 20000000:
-                        audio_address = result.get("data", {}).get("audio_address")
+        print("⚠️  TTS合成超时")
+        return None
 
-                        if audio_address:
-                            return audio_address
-                        else:
-                            print("   合成中，请稍候...")
-                    else:
-                        print(f"轮询错误: {result.get('error_message')}")
-                        break
+    def _poll_once(self, url):
+        """
+        查询一次长文本TTS任务状态
 
-                time.sleep(3)  # 每3秒轮询一次
+        Returns:
+            tuple: ("done", 音频地址) / ("pending", None) / ("error", None)
+        """
+        try:
+            response = _HTTP.get(url, timeout=5)
+        except requests.RequestException as e:
+            # 网络超时、连接重置等暂时错误：由下一次轮询或整体超时决定
+            print(f"轮询异常（将重试）: {e}")
+            return "pending", None
 
-            except Exception as e:
-                print(f"轮询异常: {e}")
-                break
+        if response.status_code == 200:
+            result = _json_loads(response.content)
 
-        print("⚠️  TTS合成超时")
-        return None
+            if result.get("error_code") != 20000000:
+                print(f"轮询错误: {result.get('error_message')}")
+                return "error", None
+
+            audio_address = result.get("data", {}).get("audio_address")
+            if audio_address:
+                return "done", audio_address
+        elif response.status_code != 429 and response.status_code < 500:
+            print(f"轮询HTTP错误: {response.status_code}")
+            return "error", None
+
+        return "pending", None
 
     def speak_async(self, text, voice="Cherry"):
         """异步播放（不阻塞）"""
-        threading.Thread(
-            target=self.speak,
-            args=(text, voice, False),
-            daemon=True
-        ).start()
+        self._speak_pool.submit(self.speak, text, voice, False)
 
     def stop(self):
         """停止当前播放（立即停止）"""
+        self._drain_play_queue()
+        # 后续片段不再播放，也不再请求合成
+        self._cancel_pending_synthesis()
         if self.is_playing:
             self.should_stop = True
             self.is_playing = False  # 立即标记为已停止
@@ -289,24 +1146,52 @@ class TTSManager:
             # 清空当前流引用
             self.current_stream = None
 
-    def _delete_file(self, filepath):
-        """删除临时文件"""
-        try:
-            if filepath.exists():
-                filepath.unlink()
-        except:
-            pass
-
     def __del__(self):
         try:
+            self._play_queue.put((None, (), threading.Event()))
+            self._executor.shutdown(wait=False)
+            self._speak_pool.shutdown(wait=False)
+            self._long_pool.shutdown(wait=False)
+            if self._notify:
+                self._notify.close()
             self.p.terminate()
         except:
             pass
 
 
+def _build_f32_to_i16():
+    """
+    编译 float32→int16 转换内核（缩放、限幅、转换在一次遍历中完成）
+
+    需要 numba（可选依赖），未安装时返回 None，调用方回退到 NumPy 实现
+
+    Returns:
+        callable: kernel(src, dst)，或 None
+    """
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        return None
+
+    @njit(cache=True, fastmath=True)
+    def f32_to_i16(src, dst):
+        for i in range(src.shape[0]):
+            v = src[i] * 32767.0
+            if v > 32767.0:
+                v = 32767.0
+            elif v < -32768.0:
+                v = -32768.0
+            dst[i] = np.int16(v)
+
+    # 预热：首次调用触发编译，避免第一句播报时卡顿
+    f32_to_i16(np.zeros(1024, dtype=np.float32), np.empty(1024, dtype=np.int16))
+    return f32_to_i16
+
+
 # ==================== 流式 TTS Manager（基于 RealtimeTTS）====================
 
-class TTSManagerStreaming:
+class TTSManagerStreaming(_PCMPlayer):
     """
     流式TTS语音播报管理器（基于RealtimeTTS）
 
@@ -352,6 +1237,17 @@ class TTSManagerStreaming:
             self.p = pyaudio.PyAudio()
             self.should_stop = False
             self.current_stream = None
+            self._play_sem = threading.BoundedSemaphore(1)  # 单输出设备，播放串行化
+            self._scratch_f32 = None  # float→int16 转换缓冲区（按需增长）
+            self._scratch_i16 = None
+            self._f32_to_i16 = _build_f32_to_i16()  # numba 内核（可选）
+
+            # 常驻输出流：按模型采样率预先打开，每次播报不再重新初始化设备
+            self._out_stream = None
+            self._out_format = None
+            sample_rate = getattr(getattr(self.piper_voice, "config", None), "sample_rate", None)
+            if sample_rate:
+                self._output_stream(2, 1, sample_rate)
 
             print(f"✓ 使用 Piper TTS（本地，超快）- 模型: {Path(model_path).name}")
             return
@@ -362,13 +1258,10 @@ class TTSManagerStreaming:
             self.voice = voice or "Cherry"
 
             # 复用 TTSManager 的逻辑（已验证可靠）
-            try:
-                import dashscope
-                dashscope.api_key = self.api_key
-                dashscope.base_http_api_url = 'https://dashscope.aliyuncs.com/api/v1'
-                self.dashscope = dashscope
-            except ImportError:
+            if dashscope is None:
                 raise ImportError("需要安装 dashscope: pip install dashscope")
+            dashscope.api_key = self.api_key
+            self.dashscope = dashscope
 
             self.audio_dir = TTS_AUDIO_DIR
             self.audio_dir.mkdir(parents=True, exist_ok=True)
@@ -376,6 +1269,14 @@ class TTSManagerStreaming:
             self.should_stop = False
             self.current_stream = None
 
+            # 非阻塞播放线程池
+            self._play_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-play")
+            self._play_sem = threading.BoundedSemaphore(1)  # 单输出设备，播放串行化
+
+            # 常驻输出流（首次播放时按音频格式打开，格式不变时复用）
+            self._out_stream = None
+            self._out_format = None
+
             print(f"✓ 使用 DashScope TTS（阿里云）- 音色: {self.voice}")
             return
 
@@ -435,45 +1336,105 @@ class TTSManagerStreaming:
         self.stream = TextToAudioStream(self.engine)
         print(f"✓ RealtimeTTS 流式引擎已初始化")
 
-    def _play_audio_file(self, audio_file):
-        """使用PyAudio直接播放音频文件（DashScope 引擎使用）"""
-        stream = None
+    def _output_stream(self, sampwidth, channels, rate):
+        """
+        获取常驻输出流（Piper/DashScope 引擎使用）
+
+        格式相同时复用已打开的流（被 stop() 停止的流重新启动），
+        避免每次播报重复初始化音频设备；格式变化时才重新打开
+
+        Returns:
+            pyaudio.Stream: 输出流
+        """
+        wav_format = (sampwidth, channels, rate)
+        stream = self._out_stream
+        if stream is not None and self._out_format == wav_format:
+            if stream.is_stopped():
+                stream.start_stream()
+            return stream
+
+        self._close_output_stream()
+        stream = self.p.open(
+            format=_WIDTH2FMT[sampwidth],
+            channels=channels,
+            rate=rate,
+            output=True,
+            frames_per_buffer=PLAYBACK_FRAMES_PER_BUFFER
+        )
+        self._out_stream, self._out_format = stream, wav_format
+        return stream
+
+    def _close_output_stream(self):
+        """关闭常驻输出流"""
+        stream, self._out_stream, self._out_format = self._out_stream, None, None
+        if stream is not None:
+            try:
+                stream.stop_stream()
+                stream.close()
+            except:
+                pass
+
+    def _drain_output_stream(self, stream):
+        """
+        等待常驻输出流中已缓冲的音频播放完毕（被打断时立即返回）
+
+        常驻流写完后不调用 stop_stream，write 返回时设备缓冲区中仍有约一个
+        输出延迟的音频；等待这段时间后再结束播报，is_playing 才与实际声音一致
+        """
+        try:
+            deadline = time.monotonic() + stream.get_output_latency()
+        except Exception:
+            return
+        while not self.should_stop:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.02))
+
+    def _play_pcm(self, chunks, wav_format):
+        """
+        播放PCM数据块（DashScope 引擎使用）
+
+        Returns:
+            bool: 是否完整播放（未被打断且未出错）
+        """
+        completed = False
         try:
             self.is_playing = True
             self.should_stop = False
 
-            with wave.open(str(audio_file), 'rb') as wf:
-                stream = self.p.open(
-                    format=self.p.get_format_from_width(wf.getsampwidth()),
-                    channels=wf.getnchannels(),
-                    rate=wf.getframerate(),
-                    output=True
-                )
-                self.current_stream = stream
-
-                chunk_size = 1024
-                data = wf.readframes(chunk_size)
-                while data and not self.should_stop:
-                    stream.write(data)
-                    data = wf.readframes(chunk_size)
+            stream = self._output_stream(*wav_format)
+            self.current_stream = stream
 
-            if self.should_stop:
-                print("   [TTS已打断]")
-
-            time.sleep(0.1)
+            completed = self._write_pcm(stream, chunks, wav_format)
+            if completed:
+                self._drain_output_stream(stream)
         except Exception as e:
-            if "Broken pipe" not in str(e):
-                print(f"播放音频失败: {e}")
+            if not self.should_stop:  # 被 stop() 停止的流写入失败属正常打断
+                if "Broken pipe" not in str(e):
+                    print(f"播放音频失败: {e}")
+                self._close_output_stream()  # 流异常时下次重新打开
         finally:
-            if stream:
-                try:
-                    stream.stop_stream()
-                    stream.close()
-                except:
-                    pass
             self.current_stream = None
             self.is_playing = False
             self.should_stop = False
+        return completed
+
+    def _fetch_and_play(self, url, audio_file):
+        """下载音频并边下边播，完整播放后写入缓存（DashScope 引擎使用）"""
+        with self._play_sem:
+            try:
+                response = _HTTP.get(url, stream=True, timeout=10)
+            except requests.RequestException as e:
+                print(f"音频下载失败: {e}")
+                return
+
+            with response:
+                if response.status_code != 200:
+                    print(f"音频下载失败: HTTP {response.status_code}")
+                    return
+                if _tee_wav_response(response, audio_file, self._play_pcm):
+                    _curate_tts_cache(self.audio_dir)
 
     def speak(self, text, voice=None, wait=True):
         """
@@ -494,98 +1455,43 @@ class TTSManagerStreaming:
         try:
             # Piper 引擎（本地流式，最快）
             if self.engine_type == "piper":
-                import numpy as np
-
-                self.is_playing = True
-                self.should_stop = False
-
-                # 生成音频（返回生成器，产生 AudioChunk 对象）
-                audio_generator = self.piper_voice.synthesize(text)
-
-                # 遍历所有 AudioChunk（可能有多个）
-                for chunk in audio_generator:
-                    if self.should_stop:
-                        break
-
-                    # 从 AudioChunk 提取音频数据
-                    audio_float = chunk.audio_float_array
-                    sample_rate = chunk.sample_rate
-
-                    # 转换为 int16 格式
-                    audio_int16 = (audio_float * 32767).astype(np.int16)
-
-                    print(f"[Piper] 播放音频块: {len(audio_float)} samples ({len(audio_float)/sample_rate:.1f}秒)")
-
-                    # 创建 PyAudio 流（第一次）
-                    if not self.current_stream:
-                        self.current_stream = self.p.open(
-                            format=pyaudio.paInt16,
-                            channels=1,
-                            rate=sample_rate,
-                            output=True,
-                            frames_per_buffer=512
-                        )
-
-                    # 分块播放（可快速中断）
-                    chunk_size = 512
-                    for i in range(0, len(audio_int16), chunk_size):
-                        if self.should_stop:
-                            break
-
-                        audio_chunk = audio_int16[i:i + chunk_size]
-                        self.current_stream.write(audio_chunk.tobytes())
-
-                    if self.should_stop:
-                        break
-
-                # 清理
-                if self.current_stream:
-                    self.current_stream.stop_stream()
-                    self.current_stream.close()
-                    self.current_stream = None
-
-                self.is_playing = False
-                if self.should_stop:
-                    print("   [Piper TTS已打断]")
+                # 同一时间只允许一个播放（单输出设备），后来的调用排队等待
+                with self._play_sem:
+                    self._speak_piper(text)
 
             # DashScope 引擎（使用原有的可靠逻辑）
             elif self.engine_type == "dashscope":
                 self.is_playing = True
 
-                # 调用 DashScope API
-                response = self.dashscope.MultiModalConversation.call(
-                    model="qwen3-tts-flash",
-                    api_key=self.api_key,
-                    text=text,
-                    voice=self.voice,
-                    language_type="Chinese",
-                    stream=False
-                )
-
-                if response.status_code == 200:
-                    audio_url = response.output.audio.url
-                    audio_response = requests.get(audio_url, timeout=10)
-                    if audio_response.status_code == 200:
-                        audio_file = self.audio_dir / f"tts_{int(time.time())}.wav"
-                        with open(audio_file, 'wb') as f:
-                            f.write(audio_response.content)
-
-                        if wait:
-                            self._play_audio_file(audio_file)
-                        else:
-                            threading.Thread(
-                                target=self._play_audio_file,
-                                args=(audio_file,),
-                                daemon=True
-                            ).start()
-
-                        # 10秒后清理临时文件
-                        threading.Timer(
-                            TTS_CACHE_TIMEOUT_SHORT,
-                            lambda: self._delete_file(audio_file)
-                        ).start()
+                # 与 TTSManager 共用持久化缓存（内容哈希）
+                audio_file = _tts_cache_path(self.audio_dir, text, self.voice)
+                if audio_file.exists():
+                    print("   命中TTS缓存")
+                    _touch(audio_file)
+                    target, args = self._play_serialized, (audio_file,)
                 else:
-                    print(f"TTS错误: {response.status_code} - {response.message}")
+                    # 调用 DashScope API
+                    response = self.dashscope.MultiModalConversation.call(
+                        model=SHORT_TTS_MODEL,
+                        api_key=self.api_key,
+                        text=text,
+                        voice=self.voice,
+                        language_type="Chinese",
+                        stream=False
+                    )
+
+                    if response.status_code == 200:
+                        # 边下载边播放，同时写入缓存
+                        target, args = self._fetch_and_play, (response.output.audio.url, audio_file)
+                    else:
+                        print(f"TTS错误: {response.status_code} - {response.message}")
+                        target = None
+
+                if target:
+                    if wait:
+                        target(*args)
+                    else:
+                        self._play_pool.submit(target, *args)
 
                 if wait:
                     self.is_playing = False
@@ -612,13 +1518,92 @@ class TTSManagerStreaming:
             if wait:
                 self.is_playing = False
 
-    def _delete_file(self, filepath):
-        """删除临时文件"""
-        try:
-            if filepath.exists():
-                filepath.unlink()
-        except:
-            pass
+    def _play_serialized(self, audio_file):
+        """播放音频文件（与其他播放互斥，后来的调用排队等待）"""
+        with self._play_sem:
+            self._play_audio_file(audio_file)
+
+    def _float_to_int16(self, audio_float):
+        """
+        float32 音频转 int16（预分配缓冲区，避免每块新建临时数组）
+
+        安装了 numba 时一次遍历直接写入 int16 缓冲区；否则用 NumPy 分步原地计算
+
+        Returns:
+            np.ndarray: int16 视图（下次调用前有效）
+        """
+        import numpy as np
+
+        n = len(audio_float)
+        if self._scratch_i16 is None or len(self._scratch_i16) < n:
+            self._scratch_f32 = None if self._f32_to_i16 else np.empty(n, dtype=np.float32)
+            self._scratch_i16 = np.empty(n, dtype=np.int16)
+
+        if self._f32_to_i16:
+            out = self._scratch_i16[:n]
+            self._f32_to_i16(audio_float, out)
+            return out
+
+        scratch = self._scratch_f32[:n]
+        np.multiply(audio_float, 32767.0, out=scratch)
+        np.clip(scratch, -32768.0, 32767.0, out=scratch)
+        out = self._scratch_i16[:n]
+        out[...] = scratch  # 原地转换为 int16
+        return out
+
+    def _speak_piper(self, text):
+        """Piper 本地合成并播放（调用方需持有播放信号量）"""
+        self.is_playing = True
+        self.should_stop = False
+
+        # 生成音频（返回生成器，产生 AudioChunk 对象）
+        audio_generator = self.piper_voice.synthesize(text)
+
+        stream = None
+
+        # 遍历所有 AudioChunk（可能有多个）
+        for chunk in audio_generator:
+            if self.should_stop:
+                break
+
+            # 从 AudioChunk 提取音频数据
+            audio_float = chunk.audio_float_array
+            sample_rate = chunk.sample_rate
+
+            # 转换为 int16 格式（缩放、限幅在预分配的缓冲区内完成）
+            audio_int16 = self._float_to_int16(audio_float)
+
+            print(f"[Piper] 播放音频块: {len(audio_float)} samples ({len(audio_float)/sample_rate:.1f}秒)")
+
+            # 获取常驻输出流（采样率不变时复用）
+            stream = self._output_stream(2, 1, sample_rate)
+            self.current_stream = stream
+
+            # 分块播放（可快速中断）
+            pcm = memoryview(audio_int16).cast("B")
+            chunk_bytes = PIPER_WRITE_FRAMES * 2
+            try:
+                for i in range(0, len(pcm), chunk_bytes):
+                    if self.should_stop:
+                        break
+
+                    stream.write(pcm[i:i + chunk_bytes])
+            except OSError:
+                if not self.should_stop:  # 被 stop() 停止的流写入失败属正常打断
+                    self._close_output_stream()
+                    raise
+
+            if self.should_stop:
+                break
+
+        # 等待设备缓冲区中的音频播完再结束播报；输出流保持打开，供下次播报复用
+        if stream is not None and not self.should_stop:
+            self._drain_output_stream(stream)
+        self.current_stream = None
+
+        self.is_playing = False
+        if self.should_stop:
+            print("   [Piper TTS已打断]")
 
     def speak_async(self, text, voice=None):
         """异步播放（不阻塞）"""
@@ -631,10 +1616,10 @@ class TTSManagerStreaming:
             if self.engine_type in ("piper", "dashscope"):
                 self.should_stop = True
                 self.is_playing = False
+                # 只停止不关闭：常驻输出流下次播放时重新启动
                 if self.current_stream:
                     try:
                         self.current_stream.stop_stream()
-                        self.current_stream.close()
                     except:
                         pass
                 self.current_stream = None
@@ -655,6 +1640,7 @@ class TTSManagerStreaming:
         """清理资源"""
         if self.engine_type in ("piper", "dashscope"):
             try:
+                self._close_output_stream()
                 self.p.terminate()
             except:
                 pass
@@ -1,8 +1,47 @@
 """视觉理解模块"""
 import base64
-import requests
+import hashlib
+import io
+from collections import OrderedDict
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
 
 from .config import DASHSCOPE_API_KEY, DASHSCOPE_API_URL
+from .http_session import session as http_session, json_dumps, json_loads
+
+# 上传前图片的最大尺寸和JPEG质量（JPEG 通常比截图PNG小5-10倍）
+VISION_MAX_SIZE = (1920, 1080)
+VISION_JPEG_QUALITY = 85
+
+# 识别结果缓存条目数（相同截图+相同问题直接返回上次结果）
+VISION_CACHE_MAX_ENTRIES = 32
+
+
+def _encode_image(data):
+    """
+    将图片数据编码为base64
+
+    安装了 Pillow 时，超出 VISION_MAX_SIZE 的图片先等比缩小，再转为JPEG，
+    减少上传体积；否则直接编码原文件
+
+    Args:
+        data: 图片文件内容
+
+    Returns:
+        (MIME类型, base64字符串)
+    """
+    if Image is None:
+        return "image/png", base64.b64encode(data).decode("ascii")
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        img.thumbnail(VISION_MAX_SIZE)
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=VISION_JPEG_QUALITY)
+    return "image/jpeg", base64.b64encode(buf.getbuffer()).decode("ascii")
 
 
 class VisionUnderstanding:
@@ -11,13 +50,22 @@ class VisionUnderstanding:
     def __init__(self, api_url=None, api_key=None):
         self.api_url = api_url or DASHSCOPE_API_URL
         self.api_key = api_key or DASHSCOPE_API_KEY
+        self._cache = OrderedDict()  # (图片sha256, 问题) -> 回答
 
     def understand_screen(self, image_path, question="屏幕上有什么内容？请详细描述。"):
-        """使用Qwen-VL-Max理解屏幕"""
+        """使用Qwen-VL-Max理解屏幕（相同截图和问题命中缓存时不再调用API）"""
         try:
-            # 直接读取图片，不压缩
             with open(image_path, "rb") as f:
-                img_base64 = base64.b64encode(f.read()).decode()
+                data = f.read()
+
+            key = (hashlib.sha256(data).hexdigest(), question)
+            answer = self._cache.get(key)
+            if answer is not None:
+                self._cache.move_to_end(key)
+                print("[视觉API] 命中缓存")
+                return answer
+
+            mime_type, img_base64 = _encode_image(data)
 
             print(f"[视觉API] 图片大小: {len(img_base64) / 1024:.1f} KB")
 
@@ -31,30 +79,35 @@ class VisionUnderstanding:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{img_base64}"
+                            "url": f"data:{mime_type};base64,{img_base64}"
                         }
                     }
                 ]
             }]
 
-            response = requests.post(
+            response = http_session.post(
                 f"{self.api_url}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
                 },
-                json={
+                # 请求体以base64图片为主，orjson 序列化大字符串快得多
+                data=json_dumps({
                     "model": "qwen-vl-max",
                     "messages": messages,
                     "max_tokens": 2000,
                     "temperature": 0.7
-                },
+                }),
                 timeout=60
             )
 
             if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
+                result = json_loads(response.content)
+                answer = result["choices"][0]["message"]["content"]
+                self._cache[key] = answer
+                if len(self._cache) > VISION_CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)
+                return answer
             else:
                 # 详细错误信息
                 error_msg = f"API错误 {response.status_code}"
@@ -1,6 +1,10 @@
 """智能语音唤醒系统 - 双阶段识别版"""
+import os
+import queue
+import sys
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pyaudio
 import sherpa_onnx
@@ -12,12 +16,48 @@ from .config import (
     CHUNK_SIZE,
     RECORD_SECONDS,
     SILENCE_THRESHOLD,
+    BARGE_IN_THRESHOLD,
     MAX_SILENCE_FRAMES,
     MIN_RECORD_FRAMES,
     DEFAULT_WAKE_WORDS,
     CONFIG_DIR,
+    KWS_USE_INT8,
+    KWS_NUM_THREADS,
+    KWS_HIGH_PRIORITY,
+    ASR_NUM_THREADS,
+    ASR_USE_STREAMING,
+    ASR_STREAMING_TAIL_SECONDS,
 )
 from .react_agent import ReactAgent
+from .audio_utils import is_loud
+
+# 采集回调与KWS处理之间的队列容量（约1秒音频），处理跟不上时丢弃新数据并告警
+AUDIO_QUEUE_MAX_CHUNKS = 32
+
+# 停止监听时等待命令录音流关闭的最长时间（秒），超时则不终止PyAudio
+PYAUDIO_RELEASE_TIMEOUT = 2.0
+
+
+def _set_thread_priority(high):
+    """设置当前线程的调度优先级
+
+    Args:
+        high: True 提高优先级（KWS监听线程），False 恢复普通优先级（后台工作线程）
+
+    Returns:
+        是否设置成功（权限不足或平台不支持时返回 False）
+    """
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            # THREAD_PRIORITY_HIGHEST = 2, THREAD_PRIORITY_NORMAL = 0
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 2 if high else 0))
+        # Linux 上 nice 值按线程生效；降低 nice 值需要 CAP_SYS_NICE
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -10 if high else 0)
+        return True
+    except (AttributeError, OSError):
+        return False
 
 
 class SmartWakeWordSystem:
@@ -33,6 +73,19 @@ class SmartWakeWordSystem:
         # 执行线程锁（确保同一时间只有一个命令在执行）
         self.execution_lock = threading.Lock()
 
+        # 共享的PyAudio实例（由 start_listening 创建），打开/关闭音频流时加锁；
+        # 记录正在使用的命令录音流数量，全部关闭后监听循环才能终止PyAudio
+        self._pyaudio = None
+        self._pyaudio_cond = threading.Condition()
+        self._pyaudio_users = 0
+
+        # 提示音与命令处理的后台线程池（避免每次唤醒新建线程）
+        # 工作线程固定为普通优先级（Linux 上新线程会继承 KWS 线程提高后的优先级）
+        self._worker_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="wake",
+            initializer=_set_thread_priority, initargs=(False,)
+        )
+
         print("正在初始化智能语音助手...")
 
         # 阶段1: KWS模型（轻量级）
@@ -41,6 +94,12 @@ class SmartWakeWordSystem:
         # 阶段2: ASR模型（重量级）
         self.asr_model = self.create_asr_model()
 
+        # 流式ASR模型（可选，存在时录音期间边录边识别）
+        self.streaming_asr_model = self.create_streaming_asr_model()
+
+        # 录音结束检测：VAD模型（可选，不存在时使用音量阈值）
+        self.vad_model = self.create_vad_model()
+
         # React Agent (集成 MCP)
         self.agent = ReactAgent()
         if enable_mcp:
@@ -49,7 +108,8 @@ class SmartWakeWordSystem:
                 raise RuntimeError("启动 MCP Server 失败")
 
         print(f"✓ KWS模型已加载")
-        print(f"✓ ASR模型已加载")
+        print(f"✓ ASR模型已加载{'（流式识别）' if self.streaming_asr_model is not None else ''}")
+        print(f"{'✓ VAD模型已加载' if self.vad_model is not None else '⏭️  未找到VAD模型，使用音量阈值检测静音'}")
         if enable_mcp:
             print(f"✓ MCP Servers 已启动")
         else:
@@ -75,17 +135,27 @@ class SmartWakeWordSystem:
                 f.write("n ǐ h ǎo zh ù sh ǒu @你好助手\n")
                 f.write("zh ì n éng zh ù sh ǒu @智能助手\n")
 
+        def model_file(name):
+            """优先使用int8量化模型（官方模型包已附带，权重约为FP32的1/4），不存在时使用FP32"""
+            if KWS_USE_INT8:
+                int8_file = kws_dir / f"{name}-epoch-12-avg-2-chunk-16-left-64.int8.onnx"
+                if int8_file.exists():
+                    return int8_file
+            return kws_dir / f"{name}-epoch-12-avg-2-chunk-16-left-64.onnx"
+
+        encoder = model_file("encoder")
         kws = sherpa_onnx.KeywordSpotter(
             tokens=str(kws_dir / "tokens.txt"),
-            encoder=str(kws_dir / "encoder-epoch-12-avg-2-chunk-16-left-64.onnx"),
-            decoder=str(kws_dir / "decoder-epoch-12-avg-2-chunk-16-left-64.onnx"),
-            joiner=str(kws_dir / "joiner-epoch-12-avg-2-chunk-16-left-64.onnx"),
-            num_threads=2,
+            encoder=str(encoder),
+            decoder=str(model_file("decoder")),
+            joiner=str(model_file("joiner")),
+            num_threads=KWS_NUM_THREADS,
             keywords_file=str(keywords_file),
             provider="cpu",
         )
 
         print(f"📋 加载关键词: {keywords_file}")
+        print(f"   KWS模型精度: {'int8' if encoder.name.endswith('.int8.onnx') else 'fp32'}")
         return kws
 
     def create_asr_model(self):
@@ -99,7 +169,7 @@ class SmartWakeWordSystem:
         recognizer = sherpa_onnx.OfflineRecognizer.from_paraformer(
             str(model_file),
             str(tokens_file),
-            num_threads=2,
+            num_threads=ASR_NUM_THREADS,
             sample_rate=self.sample_rate,
             feature_dim=80,
             decoding_method="greedy_search",
@@ -108,6 +178,43 @@ class SmartWakeWordSystem:
         )
         return recognizer
 
+    def create_streaming_asr_model(self):
+        """创建流式ASR识别模型（未启用或模型不存在时返回 None，退回离线识别）"""
+        if not ASR_USE_STREAMING:
+            return None
+
+        model_dir = self.models_dir / "sherpa-onnx-streaming-paraformer-bilingual-zh-en"
+        encoder_file = model_dir / "encoder.int8.onnx"
+        decoder_file = model_dir / "decoder.int8.onnx"
+        tokens_file = model_dir / "tokens.txt"
+        if not (encoder_file.exists() and decoder_file.exists() and tokens_file.exists()):
+            return None
+
+        recognizer = sherpa_onnx.OnlineRecognizer.from_paraformer(
+            tokens=str(tokens_file),
+            encoder=str(encoder_file),
+            decoder=str(decoder_file),
+            num_threads=ASR_NUM_THREADS,
+            sample_rate=self.sample_rate,
+            feature_dim=80,
+            decoding_method="greedy_search",
+            provider="cpu"
+        )
+        return recognizer
+
+    def create_vad_model(self):
+        """创建VAD语音活动检测模型（silero_vad.onnx 不存在时返回 None）"""
+        vad_file = self.models_dir / "silero_vad.onnx"
+        if not vad_file.exists():
+            return None
+
+        config = sherpa_onnx.VadModelConfig()
+        config.silero_vad.model = str(vad_file)
+        config.sample_rate = self.sample_rate
+        config.num_threads = 1
+        config.provider = "cpu"
+        return sherpa_onnx.VoiceActivityDetector(config, buffer_size_in_seconds=RECORD_SECONDS + 5)
+
     def _play_beep_fast(self):
         """播放快速提示音（非阻塞）"""
         def beep():
@@ -117,8 +224,8 @@ class SmartWakeWordSystem:
             except:
                 pass
 
-        # 在单独线程播放，不阻塞主循环
-        threading.Thread(target=beep, daemon=True).start()
+        # 在后台线程播放，不阻塞主循环
+        self._worker_pool.submit(beep)
 
     def start_listening(self):
         """开始监听"""
@@ -131,49 +238,88 @@ class SmartWakeWordSystem:
 
         self.running = True
 
+        # KWS监听线程是用户唯一能感知延迟的线程，提高其调度优先级
+        if KWS_HIGH_PRIORITY and not _set_thread_priority(True):
+            print("⏭️  无法提高监听线程优先级（权限不足），使用普通优先级")
+
         try:
             p = pyaudio.PyAudio()
+            self._pyaudio = p
             device_info = p.get_default_input_device_info()
             print(f"麦克风: {device_info['name']}")
 
+            # 回调模式采集：PortAudio 线程负责读取音频放入队列，
+            # 主循环只做KWS推理，采集等待与推理并行
+            audio_queue = queue.Queue(maxsize=AUDIO_QUEUE_MAX_CHUNKS)
+            dropped = [0]
+            tts = self.agent.tts
+
+            def on_audio(in_data, frame_count, time_info, status):
+                audio_data = np.frombuffer(in_data, dtype=np.float32)
+
+                # TTS播放期间仍然监听（允许打断）：音量过低（可能是TTS回声）的块
+                # 在采集线程直接丢弃，不进入队列，也不唤醒主循环
+                if tts.is_playing and not is_loud(audio_data, BARGE_IN_THRESHOLD):
+                    return (None, pyaudio.paContinue)
+
+                try:
+                    audio_queue.put_nowait(audio_data)
+                except queue.Full:
+                    dropped[0] += 1
+                return (None, pyaudio.paContinue)
+
             # 打开音频流
-            stream = p.open(
-                format=pyaudio.paFloat32,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=CHUNK_SIZE
-            )
+            with self._pyaudio_cond:
+                stream = p.open(
+                    format=pyaudio.paFloat32,
+                    channels=1,
+                    rate=self.sample_rate,
+                    input=True,
+                    frames_per_buffer=CHUNK_SIZE,
+                    stream_callback=on_audio
+                )
 
             print("✓ 开始监听关键词...\n")
 
+            # 循环内频繁使用的对象和方法绑定到局部变量（每秒约30次迭代）
+            sample_rate = self.sample_rate
+            next_chunk = audio_queue.get
+            next_chunk_nowait = audio_queue.get_nowait
+            create_stream = self.kws_model.create_stream
+            is_ready = self.kws_model.is_ready
+            decode_stream = self.kws_model.decode_stream
+            get_result = self.kws_model.get_result
+
             # 创建KWS流
-            kws_stream = self.kws_model.create_stream()
+            kws_stream = create_stream()
 
             while self.running:
                 try:
-                    # 读取音频
-                    audio_bytes = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-                    audio_data = np.frombuffer(audio_bytes, dtype=np.float32)
-
-                    # TTS播放期间仍然监听（允许打断）
-                    if self.agent.tts.is_playing:
-                        # 检测音量峰值，判断是否是真实的语音打断
-                        volume = np.sqrt(np.mean(audio_data**2))
-                        # 如果音量过低（可能是TTS回声），跳过检测
-                        if volume < 0.02:  # 降低阈值，更容易打断
-                            continue  # ✓ 移除 sleep，立即继续检测
-                        # 音量足够高，可能是用户打断，继续检测
-
-                    # 喂给KWS
-                    kws_stream.accept_waveform(self.sample_rate, audio_data)
+                    # 读取音频（超时后回到循环检查 self.running）
+                    try:
+                        audio_data = next_chunk(timeout=0.5)
+                    except queue.Empty:
+                        continue
+
+                    if dropped[0]:
+                        print(f"⚠️ 音频处理跟不上，丢弃 {dropped[0]} 个音频块")
+                        dropped[0] = 0
+
+                    # 喂给KWS：采集在回调线程中持续进行，解码期间积压的音频块
+                    # 在这里一并送入，之后只解码一次
+                    while True:
+                        kws_stream.accept_waveform(sample_rate, audio_data)
+                        try:
+                            audio_data = next_chunk_nowait()
+                        except queue.Empty:
+                            break
 
                     # 检测关键词
-                    while self.kws_model.is_ready(kws_stream):
-                        self.kws_model.decode_stream(kws_stream)
+                    while is_ready(kws_stream):
+                        decode_stream(kws_stream)
 
                     # 获取结果
-                    result = self.kws_model.get_result(kws_stream)
+                    result = get_result(kws_stream)
 
                     if result:
                         print(f"\n✨ 检测到唤醒词: {result}")
@@ -181,57 +327,48 @@ class SmartWakeWordSystem:
                         # 立即播放本地提示音（无延迟）
                         self._play_beep_fast()
 
+                        # 立即打断正在播放的TTS
+                        if tts.is_playing:
+                            tts.stop()
+
                         # 检查是否正在执行任务
                         if self.agent.is_executing:
                             print("⚠️ 正在执行任务中，发送中断请求...")
                             print("   （等待当前步骤完成后中断...）")
                             self.agent.interrupt_flag = True
 
-                            # 立即打断正在播放的TTS
-                            if self.agent.tts.is_playing:
-                                self.agent.tts.stop()
-
-                            # 快速等待任务中断（最多3秒）
-                            wait_count = 0
-                            while self.agent.is_executing and wait_count < 30:
-                                time.sleep(0.1)
-                                wait_count += 1
-
-                            if self.agent.is_executing:
+                            # 等待任务中断（最多3秒，任务结束时立即返回）
+                            if not self.agent.idle_event.wait(timeout=3.0):
                                 print("⚠️ 当前步骤仍在执行，将在下一步中断")
                             else:
                                 print("✓ 任务已中断")
+                        else:
+                            # 提交命令处理任务（非阻塞）
+                            self._worker_pool.submit(self._handle_command_in_thread)
 
-                            # 重置KWS流，等待下一次唤醒
-                            kws_stream = self.kws_model.create_stream()
-                            continue
-
-                        # 立即打断正在播放的TTS
-                        if self.agent.tts.is_playing:
-                            self.agent.tts.stop()
-
-                        # 启动命令处理线程（非阻塞）
-                        command_thread = threading.Thread(
-                            target=self._handle_command_in_thread,
-                            daemon=True
-                        )
-                        command_thread.start()
-
-                        # 重置KWS流
-                        kws_stream = self.kws_model.create_stream()
+                        # 重置KWS流，等待下一次唤醒
+                        kws_stream = create_stream()
 
                 except Exception as e:
                     print(f"⚠️ 音频处理错误: {e}")
                     # 重新创建流，继续运行
                     try:
-                        kws_stream = self.kws_model.create_stream()
+                        kws_stream = create_stream()
                     except:
                         pass
                     continue
 
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
+            with self._pyaudio_cond:
+                stream.stop_stream()
+                stream.close()
+                self._pyaudio = None
+                # 命令线程可能仍在 stream.read() 中，等它关闭录音流后再终止PyAudio
+                # （录音循环检测到 running=False 后在一个音频块内退出）
+                if self._pyaudio_cond.wait_for(lambda: self._pyaudio_users == 0,
+                                               timeout=PYAUDIO_RELEASE_TIMEOUT):
+                    p.terminate()
+                else:
+                    print("⚠️ 命令录音流未能及时关闭，跳过 PyAudio 终止")
 
         except KeyboardInterrupt:
             print("\n停止中...")
@@ -241,6 +378,7 @@ class SmartWakeWordSystem:
             print("正在停止 MCP Servers...")
             self.agent.stop()
             print("✓ MCP Servers 已停止")
+            self._worker_pool.shutdown(wait=False, cancel_futures=True)
 
     def _handle_command_in_thread(self):
         """在单独线程中处理命令（非阻塞）"""
@@ -250,10 +388,8 @@ class SmartWakeWordSystem:
             return
 
         try:
-            # 创建独立的PyAudio实例（避免与主循环冲突）
-            p = pyaudio.PyAudio()
-            self._enter_command_mode(p)
-            p.terminate()
+            # 复用监听循环的PyAudio实例（避免每次唤醒重新枚举音频设备）
+            self._enter_command_mode(self._pyaudio)
         except KeyboardInterrupt:
             print("⚠️ 用户中断命令处理")
         except Exception as e:
@@ -271,57 +407,100 @@ class SmartWakeWordSystem:
         # 短暂延迟，让用户听到Beep后准备说话
         time.sleep(0.3)
 
-        # 录音参数
-        audio_buffer = []
+        # 录音缓冲区：按最大录音时长预分配，逐块写入，结束时按实际长度截取
+        num_chunks = int(self.sample_rate / 1024 * RECORD_SECONDS)
+        full_audio = np.empty(num_chunks * 1024, dtype=np.float32)
+        write_ptr = 0
 
         try:
-            stream = pyaudio_instance.open(
-                format=pyaudio.paFloat32,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=1024
-            )
+            # VAD按录音重置状态；没有VAD模型时退回音量阈值判断
+            vad = self.vad_model
+            if vad is not None:
+                vad.reset()
+
+            # 流式ASR：录音期间逐块送入并解码，识别与录音重叠进行
+            streaming_asr = self.streaming_asr_model
+            if streaming_asr is not None:
+                asr_stream = streaming_asr.create_stream()
+
+            with self._pyaudio_cond:
+                # 监听循环已退出（PyAudio 即将或已经终止）时不再打开录音流
+                if pyaudio_instance is None or pyaudio_instance is not self._pyaudio:
+                    print("   监听已停止，取消录音")
+                    return
+                stream = pyaudio_instance.open(
+                    format=pyaudio.paFloat32,
+                    channels=1,
+                    rate=self.sample_rate,
+                    input=True,
+                    frames_per_buffer=1024
+                )
+                self._pyaudio_users += 1
 
             print("🎙️ 录音中...")
             silence_count = 0
             frame_count = 0  # 记录总帧数
             has_speech = False  # 是否检测到有效语音
 
-            for i in range(0, int(self.sample_rate / 1024 * RECORD_SECONDS)):
-                audio_bytes = stream.read(1024, exception_on_overflow=False)
-                audio_data = np.frombuffer(audio_bytes, dtype=np.float32)
-                audio_buffer.append(audio_data)
-                frame_count += 1
-
-                # 音量检测
-                volume = np.sqrt(np.mean(audio_data**2))
-
-                # 检测到有效语音（音量超过阈值）
-                if volume >= SILENCE_THRESHOLD:
-                    has_speech = True
-                    silence_count = 0
-                else:
-                    # 静音帧
-                    silence_count += 1
-
-                    # 只有在检测到有效语音后，才开始静音计数停止逻辑
-                    if has_speech and silence_count > MAX_SILENCE_FRAMES:
-                        print("   检测到静音，停止录音")
+            try:
+                for i in range(num_chunks):
+                    # 停止监听时立即结束录音，监听循环在等待录音流关闭
+                    if not self.running:
                         break
 
-            stream.stop_stream()
-            stream.close()
-
-            # 拼接音频
-            full_audio = np.concatenate(audio_buffer)
+                    audio_bytes = stream.read(1024, exception_on_overflow=False)
+                    audio_data = full_audio[write_ptr:write_ptr + 1024]
+                    audio_data[:] = np.frombuffer(audio_bytes, dtype=np.float32, count=1024)
+                    write_ptr += 1024
+                    frame_count += 1
+
+                    if streaming_asr is not None:
+                        asr_stream.accept_waveform(self.sample_rate, audio_data)
+                        while streaming_asr.is_ready(asr_stream):
+                            streaming_asr.decode_stream(asr_stream)
+
+                    # 检测到有效语音（VAD判断；无VAD时用音量阈值，静音块由峰值预判快速跳过）
+                    if vad is not None:
+                        vad.accept_waveform(audio_data)
+                        speaking = vad.is_speech_detected()
+                    else:
+                        speaking = is_loud(audio_data, SILENCE_THRESHOLD)
+
+                    if speaking:
+                        has_speech = True
+                        silence_count = 0
+                    else:
+                        # 静音帧
+                        silence_count += 1
+
+                        # 只有在检测到有效语音后，才开始静音计数停止逻辑
+                        if has_speech and silence_count > MAX_SILENCE_FRAMES:
+                            print("   检测到静音，停止录音")
+                            break
+            finally:
+                self._close_command_stream(stream)
+
+            if not self.running:
+                return
+
+            # 截取实际录制部分（视图，无复制）
+            full_audio = full_audio[:write_ptr]
 
             # ASR识别
             print("🤔 正在识别...")
-            asr_stream = self.asr_model.create_stream()
-            asr_stream.accept_waveform(self.sample_rate, full_audio)
-            self.asr_model.decode_stream(asr_stream)
-            text = asr_stream.result.text.strip()
+            if streaming_asr is not None:
+                # 录音期间已解码大部分音频，这里只需补齐尾部静音并解码剩余部分
+                tail = np.zeros(int(self.sample_rate * ASR_STREAMING_TAIL_SECONDS), dtype=np.float32)
+                asr_stream.accept_waveform(self.sample_rate, tail)
+                asr_stream.input_finished()
+                while streaming_asr.is_ready(asr_stream):
+                    streaming_asr.decode_stream(asr_stream)
+                text = streaming_asr.get_result(asr_stream).strip()
+            else:
+                asr_stream = self.asr_model.create_stream()
+                asr_stream.accept_waveform(self.sample_rate, full_audio)
+                self.asr_model.decode_stream(asr_stream)
+                text = asr_stream.result.text.strip()
 
             if text:
                 print(f"📝 识别结果: {text}")
@@ -334,6 +513,16 @@ class SmartWakeWordSystem:
         except Exception as e:
             print(f"录音识别错误: {e}")
 
+    def _close_command_stream(self, stream):
+        """关闭命令录音流，并通知可能正在等待终止PyAudio的监听循环"""
+        with self._pyaudio_cond:
+            try:
+                stream.stop_stream()
+                stream.close()
+            finally:
+                self._pyaudio_users -= 1
+                self._pyaudio_cond.notify_all()
+
     def _execute_command(self, text):
         """执行命令（使用 React Agent）"""
         print(f"🤖 开始执行: {text}")
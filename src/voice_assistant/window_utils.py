@@ -0,0 +1,119 @@
+"""Win32 窗口工具函数（前台窗口坐标、浏览器窗口查找）"""
+import ctypes
+from ctypes import wintypes
+from typing import Dict, Optional, Tuple
+
+# 浏览器窗口标题关键字（按优先级排列，匹配时不区分大小写）
+BROWSER_TITLE_KEYWORDS = ("Chrome", "Edge", "Firefox")
+
+SW_RESTORE = 9
+
+_dpi_aware = False
+
+
+def ensure_dpi_aware():
+    """设置 DPI 感知（进程内只需一次）"""
+    global _dpi_aware
+    if _dpi_aware:
+        return
+    try:
+        ctypes.windll.shcore.SetProcessDpiAwareness(2)
+    except Exception:
+        # 可能已经设置过，忽略错误
+        pass
+    _dpi_aware = True
+
+
+def window_bbox(hwnd, padding: int = 8) -> Optional[Tuple[int, int, int, int]]:
+    """
+    获取窗口坐标（去除边框和阴影）
+
+    Args:
+        hwnd: 窗口句柄
+        padding: 边框修正值（Windows 10/11 典型值为 8）
+
+    Returns:
+        (left, top, right, bottom) 或 None
+    """
+    ensure_dpi_aware()
+    rect = wintypes.RECT()
+    if not ctypes.windll.user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+        return None
+    return (
+        rect.left + padding,
+        rect.top,
+        rect.right - padding,
+        rect.bottom - padding
+    )
+
+
+def foreground_bbox(padding: int = 8) -> Optional[Tuple[int, int, int, int]]:
+    """
+    获取前台窗口坐标
+
+    直接调用 GetForegroundWindow（一次系统调用），无需枚举所有窗口；
+    前台窗口不可见或已最小化时返回 None
+
+    Returns:
+        (left, top, right, bottom) 或 None
+    """
+    try:
+        user32 = ctypes.windll.user32
+        hwnd = user32.GetForegroundWindow()
+        if not hwnd or not user32.IsWindowVisible(hwnd) or user32.IsIconic(hwnd):
+            return None
+        return window_bbox(hwnd, padding)
+    except Exception:
+        return None
+
+
+def find_browser_window() -> Optional[Tuple[str, int]]:
+    """
+    一次 EnumWindows 枚举查找浏览器窗口
+
+    按 BROWSER_TITLE_KEYWORDS 的优先级返回第一个可见的浏览器窗口
+
+    Returns:
+        (浏览器名称, 窗口句柄) 或 None
+    """
+    user32 = ctypes.windll.user32
+    keywords = [(name, name.lower()) for name in BROWSER_TITLE_KEYWORDS]
+    found: Dict[str, int] = {}
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def _callback(hwnd, _lparam):
+        if not user32.IsWindowVisible(hwnd):
+            return True
+        length = user32.GetWindowTextLengthW(hwnd)
+        if not length:
+            return True
+        buff = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buff, length + 1)
+        title = buff.value.lower()
+        for name, keyword in keywords:
+            if name not in found and keyword in title:
+                found[name] = hwnd
+        return True
+
+    try:
+        user32.EnumWindows(_callback, 0)
+    except Exception:
+        return None
+
+    for name in BROWSER_TITLE_KEYWORDS:
+        if name in found:
+            return name, found[name]
+    return None
+
+
+def activate_window(hwnd):
+    """
+    激活窗口（最小化的窗口先还原，否则 GetWindowRect 得到的是图标化坐标）
+
+    Args:
+        hwnd: 窗口句柄
+    """
+    user32 = ctypes.windll.user32
+    if user32.IsIconic(hwnd):
+        user32.ShowWindow(hwnd, SW_RESTORE)
+    user32.SetForegroundWindow(hwnd)
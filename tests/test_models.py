@@ -4,15 +4,76 @@
 """
 
 import os
+import re
+import mmap
+import struct
 import wave
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import sherpa_onnx
 from pathlib import Path
 
+# soundfile（可选依赖）：libsndfile 在C层完成WAV读写和格式转换
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+# 识别器/合成器线程数：使用一半CPU核心，批量解码时充分利用算子内并行。
+# sherpa-onnx 不支持ORT全局共享线程池，每个会话各有线程池；测试按顺序执行，
+# 同一时间只有一个会话在推理，VAD 固定单线程，总线程数保持可控
+NUM_THREADS = max(1, (os.cpu_count() or 2) // 2)
+
+# int16 → [-1, 1) float32 的缩放系数（float32 标量，乘法全程在 float32 下完成）
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
+# 模型目录内 .onnx 文件的分类规则
+_MODEL_FILE_PATTERN = re.compile(r'(encoder|decoder|joiner|model).*\.onnx$')
+
 class ModelTester:
-    def __init__(self, models_dir: str = "models"):
+    def __init__(self, models_dir: str = "models", enable_playback: bool = False):
         self.models_dir = Path(models_dir)
+        self.enable_playback = enable_playback  # 是否播放合成的音频（批量验证时关闭）
+        
+        # 后台播放：单线程按顺序播放，后续测试不等待播放结束
+        self._playback_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playback")
+        self._pa = None
+        self._pa_stream = None
+        self._pa_rate = None
+        
+        # 模型目录索引：只遍历一次 models 目录，各测试按名称子串查找
+        self._dir_index = {}
+        self._file_index = {}
+        if self.models_dir.is_dir():
+            for p in self.models_dir.iterdir():
+                (self._dir_index if p.is_dir() else self._file_index)[p.name] = p
+        self._model_files = {}  # 各模型目录的文件分类缓存 {目录: {类别: 文件}}
         self.test_results = {}
+        self._f32_buf = np.empty(0, dtype=np.float32)  # WAV转换复用的float32缓冲区
+        self._scratch_f32 = np.empty(0, dtype=np.float32)  # 保存音频时的缩放缓冲区
+        self._i16_buf = np.empty(0, dtype=np.int16)  # 保存音频时的int16输出缓冲区
+        self._preloaded = {}  # 后台预加载的模型 {名称: Future}
+        self._audio_cache = {}  # 已从磁盘解码的测试音频 {文件名: (采样率, float32 数组)}
+    
+    def preload(self, executor):
+        """在线程池中并行加载各测试的模型（ONNX 会话创建期间释放GIL）
+        
+        测试本身仍按顺序执行（STT/VAD 依赖 TTS 生成的音频），
+        每个测试开始时取用已加载好的模型
+        """
+        tts_dir = self._find_tts_dir()
+        if tts_dir:
+            self._preloaded["TTS"] = executor.submit(self._create_tts, tts_dir)
+        stt_dir = self._find_stt_dir()
+        if stt_dir:
+            self._preloaded["STT"] = executor.submit(self._create_stt_recognizer, stt_dir)
+        vad_file = self._file_index.get("silero_vad.onnx")
+        if vad_file:
+            self._preloaded["VAD"] = executor.submit(self._create_vad, vad_file)
+    
+    def _get_model(self, name, factory, *args):
+        """取用预加载的模型（未预加载时直接创建）"""
+        future = self._preloaded.pop(name, None)
+        return future.result() if future else factory(*args)
     
     def test_tts(self):
         """测试语音合成（TTS）"""
@@ -21,32 +82,18 @@ class ModelTester:
         print("="*60)
         
         # 查找TTS模型目录
-        tts_dirs = list(self.models_dir.glob("*melo-tts*"))
-        if not tts_dirs:
+        tts_dir = self._find_tts_dir()
+        if not tts_dir:
             print("❌ 未找到TTS模型")
             print(f"   请确保已下载模型到: {self.models_dir.absolute()}")
             self.test_results["TTS"] = False
             return
         
-        tts_dir = tts_dirs[0]
         print(f"📁 模型目录: {tts_dir.name}")
         
         try:
-            # 配置TTS
-            config = sherpa_onnx.OfflineTtsConfig(
-                model=sherpa_onnx.OfflineTtsModelConfig(
-                    vits=sherpa_onnx.OfflineTtsVitsModelConfig(
-                        model=str(tts_dir / "model.onnx"),
-                        tokens=str(tts_dir / "tokens.txt"),
-                        data_dir=str(tts_dir / "espeak-ng-data"),
-                    )
-                ),
-                rule_fsts="",
-                max_num_sentences=1,
-            )
-            
             # 创建TTS对象
-            tts = sherpa_onnx.OfflineTts(config)
+            tts = self._get_model("TTS", self._create_tts, tts_dir)
             print(f"✅ TTS模型加载成功")
             print(f"   采样率: {tts.sample_rate} Hz")
             
@@ -56,19 +103,18 @@ class ModelTester:
                 "欢迎来到智能监控大屏。",
             ]
             
-            for i, text in enumerate(test_texts, 1):
+            for i, (text, audio) in enumerate(zip(test_texts, self._generate_batch(tts, test_texts)), 1):
                 print(f"\n🎤 测试文本 {i}: {text}")
-                # 修复API调用：使用sid而不是speaker_id
-                audio = tts.generate(text, speed=1.0, sid=0)
                 
                 # 保存音频
                 output_file = f"test_tts_{i}.wav"
                 self._save_audio(audio.samples, tts.sample_rate, output_file)
                 print(f"   ✅ 已生成音频: {output_file}")
                 
-                # 播放音频
-                print(f"   🔊 正在播放...")
-                self._play_audio(output_file)
+                # 播放音频（仅交互模式）：直接播放内存中的采样，后台进行
+                if self.enable_playback:
+                    print(f"   🔊 正在播放...")
+                    self._playback_pool.submit(self._play_samples, audio.samples, tts.sample_rate, output_file)
             
             self.test_results["TTS"] = True
             print("\n✅ TTS测试通过！")
@@ -84,25 +130,17 @@ class ModelTester:
         print("="*60)
         
         # 查找STT模型目录
-        stt_dirs = list(self.models_dir.glob("*paraformer*")) or \
-                   list(self.models_dir.glob("*whisper*"))
+        stt_dir = self._find_stt_dir()
         
-        if not stt_dirs:
+        if not stt_dir:
             print("❌ 未找到STT模型")
             self.test_results["STT"] = False
             return
         
-        stt_dir = stt_dirs[0]
         print(f"📁 模型目录: {stt_dir.name}")
         
         try:
-            # 判断模型类型
-            if "paraformer" in stt_dir.name:
-                recognizer = self._create_paraformer_recognizer(stt_dir)
-                model_type = "Paraformer"
-            else:
-                recognizer = self._create_whisper_recognizer(stt_dir)
-                model_type = "Whisper"
+            recognizer, model_type = self._get_model("STT", self._create_stt_recognizer, stt_dir)
             
             print(f"✅ {model_type}模型加载成功")
             print(f"   采样率: {recognizer.sample_rate} Hz")
@@ -110,14 +148,21 @@ class ModelTester:
             # 使用之前TTS生成的音频测试识别
             test_files = ["test_tts_1.wav", "test_tts_2.wav"]
             
+            existing_files = []
             for audio_file in test_files:
                 if not Path(audio_file).exists():
                     print(f"⚠️  测试文件不存在: {audio_file}")
                     continue
-                
+                existing_files.append(audio_file)
+            
+            # 所有文件一次批量解码
+            streams = [self._load_stream(recognizer, f) for f in existing_files]
+            if streams:
+                recognizer.decode_streams(streams)
+            
+            for audio_file, stream in zip(existing_files, streams):
                 print(f"\n🎧 测试文件: {audio_file}")
-                text = self._recognize_audio(recognizer, audio_file)
-                print(f"   📝 识别结果: {text}")
+                print(f"   📝 识别结果: {stream.result.text}")
             
             self.test_results["STT"] = True
             print("\n✅ STT测试通过！")
@@ -133,7 +178,7 @@ class ModelTester:
         print("="*60)
         
         # 查找KWS模型目录
-        kws_dirs = list(self.models_dir.glob("*kws*"))
+        kws_dirs = self._find_model("kws")
         
         if not kws_dirs:
             print("❌ 未找到KWS模型")
@@ -145,9 +190,10 @@ class ModelTester:
         
         try:
             # 查找模型文件
-            encoder = list(kws_dir.glob("*encoder*.onnx"))[0]
-            decoder = list(kws_dir.glob("*decoder*.onnx"))[0]
-            joiner = list(kws_dir.glob("*joiner*.onnx"))[0]
+            files = self._classify_model_dir(kws_dir)
+            encoder = files["encoder"]
+            decoder = files["decoder"]
+            joiner = files["joiner"]
             tokens = kws_dir / "tokens.txt"
             
             # 创建临时关键词文件
@@ -183,9 +229,9 @@ class ModelTester:
         print("="*60)
         
         # 查找VAD模型
-        vad_file = self.models_dir / "silero_vad.onnx"
+        vad_file = self._file_index.get("silero_vad.onnx")
         
-        if not vad_file.exists():
+        if not vad_file:
             print("❌ 未找到VAD模型")
             self.test_results["VAD"] = False
             return
@@ -193,12 +239,7 @@ class ModelTester:
         print(f"📁 模型文件: {vad_file.name}")
         
         try:
-            # 创建VAD配置
-            config = sherpa_onnx.VadModelConfig()
-            config.silero_vad.model = str(vad_file)
-            config.sample_rate = 16000
-            
-            vad = sherpa_onnx.VoiceActivityDetector(config, buffer_size_in_seconds=10)
+            vad = self._get_model("VAD", self._create_vad, vad_file)
             
             print(f"✅ VAD模型加载成功")
             print(f"   采样率: 16000 Hz")
@@ -209,13 +250,15 @@ class ModelTester:
                 print(f"\n🎧 测试文件: {test_file}")
                 
                 # 读取音频
-                with wave.open(test_file, 'rb') as wf:
-                    sample_rate = wf.getframerate()
-                    samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
-                    samples = samples.astype(np.float32) / 32768.0
+                sample_rate, samples = self._get_audio(test_file)
                 
-                # VAD检测
-                vad.accept_waveform(samples)
+                # VAD检测：按 silero_vad 的窗口大小（512采样点，32ms）逐段送入，
+                # 检测到语音即提前结束
+                window_size = 512
+                for start in range(0, len(samples), window_size):
+                    vad.accept_waveform(samples[start:start + window_size])
+                    if vad.is_speech_detected():
+                        break
                 
                 if vad.is_speech_detected():
                     print(f"   ✅ 检测到语音")
@@ -231,18 +274,126 @@ class ModelTester:
     
     # === 辅助方法 ===
     
+    def _find_model(self, substr):
+        """按名称子串查找模型目录（基于初始化时建立的目录索引）"""
+        return [p for name, p in self._dir_index.items() if substr in name]
+    
+    def _classify_model_dir(self, model_dir):
+        """单次 scandir 遍历模型目录，按文件名分类 .onnx 文件
+        
+        Returns:
+            dict: {"encoder"/"decoder"/"joiner"/"model": Path, "tokens": Path}，
+            同一类别有多个文件时优先 int8 量化模型（与运行时 KWS_USE_INT8 默认一致），
+            其余按文件名排序取第一个，结果与目录遍历顺序无关；结果按目录缓存
+        """
+        files = self._model_files.get(model_dir)
+        if files is not None:
+            return files
+        
+        files = {}
+        candidates = {}
+        with os.scandir(model_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                if entry.name == "tokens.txt":
+                    files["tokens"] = Path(entry.path)
+                    continue
+                match = _MODEL_FILE_PATTERN.search(entry.name)
+                if match:
+                    candidates.setdefault(match.group(1), []).append(Path(entry.path))
+        
+        for kind, paths in candidates.items():
+            files[kind] = min(paths, key=lambda p: (not p.name.endswith(".int8.onnx"), p.name))
+        
+        self._model_files[model_dir] = files
+        return files
+    
+    def _find_tts_dir(self):
+        """查找TTS模型目录（未找到返回 None）"""
+        tts_dirs = self._find_model("melo-tts")
+        return tts_dirs[0] if tts_dirs else None
+    
+    def _find_stt_dir(self):
+        """查找STT模型目录（优先Paraformer，未找到返回 None）"""
+        stt_dirs = self._find_model("paraformer") or self._find_model("whisper")
+        return stt_dirs[0] if stt_dirs else None
+    
+    def _create_tts(self, tts_dir):
+        """创建TTS对象
+        
+        模型目录带有词典（lexicon.txt）时使用词典 + jieba 分词前端，
+        并加载目录中的规则FST（数字、日期、符号读法）：词典和FST在创建时
+        一次性编译载入，之后每句合成直接查表；否则退回 espeak-ng 前端
+        """
+        import sherpa_onnx  # 延迟导入：加载 ONNX Runtime 较慢，仅在真正创建模型时导入
+        
+        lexicon = tts_dir / "lexicon.txt"
+        if lexicon.exists():
+            dict_dir = tts_dir / "dict"
+            frontend = dict(
+                lexicon=str(lexicon),
+                dict_dir=str(dict_dir) if dict_dir.is_dir() else "",
+            )
+        else:
+            frontend = dict(data_dir=str(tts_dir / "espeak-ng-data"))
+        
+        rule_fsts = [tts_dir / name for name in ("phone.fst", "date.fst", "number.fst")]
+        
+        config = sherpa_onnx.OfflineTtsConfig(
+            model=sherpa_onnx.OfflineTtsModelConfig(
+                vits=sherpa_onnx.OfflineTtsVitsModelConfig(
+                    model=str(tts_dir / "model.onnx"),
+                    tokens=str(tts_dir / "tokens.txt"),
+                    **frontend,
+                ),
+                num_threads=NUM_THREADS,
+            ),
+            rule_fsts=",".join(str(f) for f in rule_fsts if f.exists()),
+            max_num_sentences=1,
+        )
+        return sherpa_onnx.OfflineTts(config)
+    
+    def _create_stt_recognizer(self, stt_dir):
+        """按目录名判断模型类型并创建识别器，返回 (识别器, 模型类型)"""
+        if "paraformer" in stt_dir.name:
+            return self._create_paraformer_recognizer(stt_dir), "Paraformer"
+        return self._create_whisper_recognizer(stt_dir), "Whisper"
+    
+    def _create_vad(self, vad_file):
+        """创建VAD检测器"""
+        import sherpa_onnx
+        
+        config = sherpa_onnx.VadModelConfig()
+        config.silero_vad.model = str(vad_file)
+        config.sample_rate = 16000
+        config.num_threads = 1  # silero VAD 每次仅处理512个采样点，多线程无收益
+        
+        return sherpa_onnx.VoiceActivityDetector(config, buffer_size_in_seconds=10)
+    
+    def _generate_batch(self, tts, texts):
+        """批量合成（后台线程依次合成，与主线程的保存/播放重叠）
+        
+        sherpa-onnx 的 OfflineTts 没有批量接口，这里用单个后台线程按顺序
+        调用 generate：模型调用保持串行，但下一句的合成不再等待上一句播放结束
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # 修复API调用：使用sid而不是speaker_id
+            yield from executor.map(lambda text: tts.generate(text, speed=1.0, sid=0), texts)
+    
     def _create_paraformer_recognizer(self, model_dir):
         """创建Paraformer识别器"""
+        import sherpa_onnx
+        
         # 查找模型文件
-        encoder_files = list(model_dir.glob("*encoder*.onnx"))
-        decoder_files = list(model_dir.glob("*decoder*.onnx"))
+        files = self._classify_model_dir(model_dir)
         
-        if not encoder_files:
+        # 单文件 Paraformer 模型命名为 model*.onnx
+        encoder = files.get("encoder") or files.get("model")
+        if not encoder:
             raise FileNotFoundError(f"未找到encoder文件: {model_dir}")
         
-        encoder = encoder_files[0]
-        decoder = decoder_files[0] if decoder_files else None
-        tokens = model_dir / "tokens.txt"
+        tokens = files.get("tokens", model_dir / "tokens.txt")
         
         config = sherpa_onnx.OfflineRecognizerConfig(
             model_config=sherpa_onnx.OfflineModelConfig(
@@ -250,7 +401,7 @@ class ModelTester:
                     model=str(encoder),
                 ),
                 tokens=str(tokens),
-                num_threads=2,
+                num_threads=NUM_THREADS,
             )
         )
         
@@ -258,6 +409,8 @@ class ModelTester:
     
     def _create_whisper_recognizer(self, model_dir):
         """创建Whisper识别器"""
+        import sherpa_onnx
+        
         encoder = model_dir / "tiny.en-encoder.onnx"
         decoder = model_dir / "tiny.en-decoder.onnx"
         tokens = model_dir / "tiny.en-tokens.txt"
@@ -269,38 +422,195 @@ class ModelTester:
                     decoder=str(decoder),
                 ),
                 tokens=str(tokens),
-                num_threads=2,
+                num_threads=NUM_THREADS,
             )
         )
         
         return sherpa_onnx.OfflineRecognizer(config)
     
-    def _recognize_audio(self, recognizer, audio_file):
-        """识别音频文件"""
-        with wave.open(audio_file, 'rb') as wf:
-            sample_rate = wf.getframerate()
-            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
-            samples = samples.astype(np.float32) / 32768.0
+    def _load_stream(self, recognizer, audio_file):
+        """读取音频文件并送入新建的识别流（尚未解码）"""
+        sample_rate, samples = self._get_audio(audio_file)
         
         stream = recognizer.create_stream()
         stream.accept_waveform(sample_rate, samples)
-        recognizer.decode_stream(stream)
+        return stream
+    
+    def _get_audio(self, filename):
+        """获取测试音频，返回 (采样率, float32 数组)
         
-        return stream.result.text
+        STT/VAD 测试读取的是 TTS 测试写出的 int16 WAV 文件（验证完整的保存-读回流程），
+        每个文件只从磁盘读取、解码一次；缓存的是副本（_read_wav 返回的是复用缓冲区的视图）
+        """
+        cached = self._audio_cache.get(filename)
+        if cached is None:
+            sample_rate, samples = self._read_wav(filename)
+            cached = self._audio_cache[filename] = (sample_rate, samples.copy())
+        return cached
+    
+    def _read_wav(self, filename):
+        """读取WAV文件为 float32 数组，返回 (采样率, 音频数组)
+        
+        安装了 soundfile 时由 libsndfile 直接读出归一化的 float32 数组，
+        否则使用内存映射读取；无法映射的文件退回分块读取
+        """
+        if soundfile is not None:
+            samples, sample_rate = soundfile.read(filename, dtype='float32', always_2d=False)
+            return sample_rate, samples
+        try:
+            return self._load_wav_mmap(filename)
+        except (OSError, ValueError):
+            return self._read_wav_chunked(filename)
+    
+    def _read_wav_chunked(self, filename, chunk_frames=524288):
+        """分块读取16位PCM WAV文件（每块约1MB）
+        
+        不一次性 readframes 整个文件：每块直接转换写入复用的 float32 缓冲区，
+        长录音也只有这一块连续内存
+        
+        Args:
+            filename: WAV文件路径
+            chunk_frames: 每次读取的帧数
+        
+        Returns:
+            (采样率, float32 音频数组)；与 _load_wav_mmap 相同，返回复用缓冲区的视图
+        """
+        with wave.open(filename, 'rb') as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                raise ValueError(f"仅支持16位单声道WAV: {filename}")
+            sample_rate = wf.getframerate()
+            total_frames = wf.getnframes()
+            
+            if self._f32_buf.size < total_frames:
+                self._f32_buf = np.empty(total_frames, dtype=np.float32)
+            out = self._f32_buf[:total_frames]
+            
+            offset = 0
+            while offset < total_frames:
+                chunk = np.frombuffer(wf.readframes(chunk_frames), dtype=np.int16)
+                if chunk.size == 0:
+                    break
+                np.multiply(chunk, _INT16_SCALE, out=out[offset:offset + chunk.size], dtype=np.float32)
+                offset += chunk.size
+        
+        return sample_rate, out[:offset]
+    
+    def _load_wav_mmap(self, filename):
+        """内存映射读取16位PCM WAV文件
+        
+        int16 数据直接在映射内存上解释（不经过 readframes 复制），缩放时
+        写入复用的 float32 缓冲区，整个过程只有这一次转换写入
+        
+        Args:
+            filename: WAV文件路径
+        
+        Returns:
+            (采样率, float32 音频数组)；数组是复用缓冲区的视图，
+            下次调用前有效（accept_waveform 会复制数据）
+        """
+        with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:4] != b'RIFF' or mm[8:12] != b'WAVE':
+                raise ValueError(f"不是有效的WAV文件: {filename}")
+            
+            # 遍历RIFF子块，找到 fmt 和 data
+            sample_rate = None
+            offset = 12
+            while offset + 8 <= len(mm):
+                chunk_id = mm[offset:offset + 4]
+                chunk_size = struct.unpack_from('<I', mm, offset + 4)[0]
+                body = offset + 8
+                if chunk_id == b'fmt ':
+                    _, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', mm, body)
+                    if bits != 16 or channels != 1:
+                        raise ValueError(f"仅支持16位单声道WAV: {filename}")
+                elif chunk_id == b'data':
+                    break
+                offset = body + chunk_size + (chunk_size & 1)  # 子块按偶数字节对齐
+            else:
+                raise ValueError(f"WAV文件缺少data块: {filename}")
+            if sample_rate is None:
+                raise ValueError(f"WAV文件缺少fmt块: {filename}")
+            
+            count = min(chunk_size, len(mm) - body) // 2
+            if self._f32_buf.size < count:
+                self._f32_buf = np.empty(count, dtype=np.float32)
+            out = self._f32_buf[:count]
+            
+            samples = np.frombuffer(mm, dtype=np.int16, count=count, offset=body)
+            np.multiply(samples, _INT16_SCALE, out=out, dtype=np.float32)
+            del samples  # 关闭映射前释放对映射内存的引用
+        
+        return sample_rate, out
     
     def _save_audio(self, samples, sample_rate, filename):
-        """保存音频文件"""
+        """保存音频文件（缩放、取整、转换都写入复用缓冲区，不产生临时数组）"""
+        if soundfile is not None:
+            # libsndfile 在C层完成 float→int16 转换
+            soundfile.write(filename, samples, sample_rate, subtype='PCM_16')
+            return
+        
+        n = len(samples)
+        if self._i16_buf.size < n:
+            self._scratch_f32 = np.empty(n, dtype=np.float32)
+            self._i16_buf = np.empty(n, dtype=np.int16)
+        scratch = self._scratch_f32[:n]
+        pcm = self._i16_buf[:n]
+        
+        np.multiply(samples, 32767.0, out=scratch, dtype=np.float32)
+        np.rint(scratch, out=scratch)
+        np.clip(scratch, -32768, 32767, out=scratch)
+        np.copyto(pcm, scratch, casting='unsafe')
+        
         with wave.open(filename, 'wb') as wf:
             wf.setnchannels(1)
             wf.setsampwidth(2)
             wf.setframerate(sample_rate)
-            wf.writeframes((samples * 32767).astype(np.int16).tobytes())
+            wf.writeframes(pcm)  # 直接写入缓冲区内容，无需 tobytes 复制
+    
+    def _play_samples(self, samples, sample_rate, filename):
+        """播放内存中的 float32 采样（复用同一个 PyAudio 输出流，不再读回WAV文件）
+        
+        在播放线程中按提交顺序执行；没有 PyAudio 时退回 winsound 播放已保存的文件
+        """
+        try:
+            import pyaudio
+        except ImportError:
+            self._play_audio(filename)
+            return
+        
+        try:
+            if self._pa_stream is None or self._pa_rate != sample_rate:
+                self._close_stream()
+                if self._pa is None:
+                    self._pa = pyaudio.PyAudio()
+                self._pa_stream = self._pa.open(
+                    format=pyaudio.paFloat32, channels=1, rate=sample_rate, output=True
+                )
+                self._pa_rate = sample_rate
+            self._pa_stream.write(np.asarray(samples, dtype=np.float32).tobytes())
+        except Exception as e:
+            print(f"   ⚠️  播放失败: {e}")
+    
+    def _close_stream(self):
+        """关闭播放输出流"""
+        if self._pa_stream is not None:
+            self._pa_stream.stop_stream()
+            self._pa_stream.close()
+            self._pa_stream = None
+    
+    def close(self):
+        """等待后台播放结束并释放音频设备"""
+        self._playback_pool.shutdown(wait=True)
+        self._close_stream()
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
     
     def _play_audio(self, filename):
         """播放音频（Windows）"""
         try:
             import winsound
-            winsound.PlaySound(filename, winsound.SND_FILENAME)
+            winsound.PlaySound(filename, winsound.SND_FILENAME | winsound.SND_NODEFAULT)
         except Exception as e:
             print(f"   ⚠️  播放失败: {e}")
     
@@ -349,13 +659,19 @@ def main():
     
     input("\n按Enter键开始测试...")
     
-    # 开始测试
-    tester = ModelTester()
+    # 开始测试：模型在后台并行加载，测试按顺序执行
+    tester = ModelTester(enable_playback=True)
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        tester.preload(executor)
+        
+        tester.test_tts()
+        tester.test_stt()
+        tester.test_kws()
+        tester.test_vad()
     
-    tester.test_tts()
-    tester.test_stt()
-    tester.test_kws()
-    tester.test_vad()
+    # 等待后台播放完成
+    tester.close()
     
     # 打印总结
     tester.print_summary()
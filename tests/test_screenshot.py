@@ -1,22 +1,167 @@
 """测试各种截图方案的可靠性"""
 import ctypes
+import io
+import sys
+import threading
 from ctypes import wintypes
-from PIL import ImageGrab
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# 模块导入时统一设置 DPI 感知，所有测试使用一致的物理像素坐标
+try:
+    ctypes.windll.shcore.SetProcessDpiAwareness(2)
+    DPI_AWARE = True
+except Exception:
+    DPI_AWARE = False
+
+DPI_AWARENESS_CONTEXT_UNAWARE = -1
+
+
+def _set_thread_dpi_awareness(context):
+    """
+    设置当前线程的 DPI 感知上下文（Windows 10 1607+）
+
+    Returns:
+        之前的上下文句柄；系统不支持或设置失败时返回 None
+    """
+    try:
+        func = ctypes.windll.user32.SetThreadDpiAwarenessContext
+    except (AttributeError, OSError):
+        return None
+    func.restype = ctypes.c_void_p
+    func.argtypes = [ctypes.c_void_p]
+    return func(context) or None
+
+
+class _ThreadOutput:
+    """按线程缓冲 print 输出，并行测试结束后由主线程按顺序输出"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer if buffer is not None else self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def capture(self, func):
+        """在当前线程执行 func，返回 (返回值, 期间输出的文本)"""
+        self._local.buffer = io.StringIO()
+        try:
+            return func(), self._local.buffer.getvalue()
+        finally:
+            self._local.buffer = None
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+
+def _capture_bitblt(bbox=None):
+    """
+    GDI BitBlt 截图：直接拷贝到 DIB 内存，返回 BGRA 的 NumPy 数组
+
+    不经过 PIL 的中间图像和 RGBA→RGB 转换，只在保存时才构造 PIL 图像
+
+    Args:
+        bbox: (left, top, right, bottom) 屏幕坐标，None 表示主显示器全屏
+
+    Returns:
+        np.ndarray: 形状 (h, w, 4) 的 uint8 数组（BGRA 顺序）
+    """
+    import numpy as np
+
+    user32 = ctypes.windll.user32
+    gdi32 = ctypes.windll.gdi32
+    gdi32.CreateCompatibleDC.restype = wintypes.HDC
+    gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+    gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+    gdi32.CreateDIBSection.argtypes = [
+        wintypes.HDC, ctypes.c_void_p, wintypes.UINT,
+        ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD
+    ]
+    gdi32.SelectObject.restype = wintypes.HGDIOBJ
+    gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+    gdi32.BitBlt.argtypes = [
+        wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD
+    ]
+    gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+    gdi32.DeleteDC.argtypes = [wintypes.HDC]
+    user32.GetDC.restype = wintypes.HDC
+    user32.GetDC.argtypes = [wintypes.HWND]
+    user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+
+    if bbox is None:
+        bbox = (0, 0, user32.GetSystemMetrics(0), user32.GetSystemMetrics(1))
+    left, top, right, bottom = bbox
+    width, height = right - left, bottom - top
+
+    header = BITMAPINFOHEADER()
+    header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+    header.biWidth = width
+    header.biHeight = -height  # 负高度：自上而下的行顺序，与数组行顺序一致
+    header.biPlanes = 1
+    header.biBitCount = 32
+    header.biCompression = 0  # BI_RGB
+
+    hdc_src = user32.GetDC(None)
+    hdc_mem = gdi32.CreateCompatibleDC(hdc_src)
+    bits = ctypes.c_void_p()
+    hbmp = gdi32.CreateDIBSection(hdc_mem, ctypes.byref(header), 0, ctypes.byref(bits), None, 0)
+    try:
+        if not hbmp:
+            raise OSError("CreateDIBSection 失败")
+        old = gdi32.SelectObject(hdc_mem, hbmp)
+        # SRCCOPY | CAPTUREBLT（包含分层窗口）
+        if not gdi32.BitBlt(hdc_mem, 0, 0, width, height, hdc_src, left, top, 0x00CC0020 | 0x40000000):
+            raise OSError("BitBlt 失败")
+        gdi32.SelectObject(hdc_mem, old)
+
+        # DIB 内存随位图释放，这里做唯一一次拷贝
+        buf = (ctypes.c_ubyte * (width * height * 4)).from_address(bits.value)
+        return np.ctypeslib.as_array(buf).reshape(height, width, 4).copy()
+    finally:
+        if hbmp:
+            gdi32.DeleteObject(hbmp)
+        gdi32.DeleteDC(hdc_mem)
+        user32.ReleaseDC(None, hdc_src)
+
+
+def _to_image(bgra):
+    """BGRA 数组转换为 PIL 图像（直接按 BGRX 解码原始缓冲区，不额外拷贝）"""
+    from PIL import Image
+
+    height, width = bgra.shape[:2]
+    return Image.frombuffer("RGB", (width, height), bgra, "raw", "BGRX", 0, 1)
+
 
 def test_fullscreen_screenshot():
     """测试1: 全屏截图"""
     print("\n=== 测试1: 全屏截图 ===")
     try:
-        screenshot = ImageGrab.grab()
-        size = screenshot.size
-        print(f"✅ 成功: {size[0]}x{size[1]} 像素")
+        screenshot = _capture_bitblt()
+        print(f"✅ 成功: {screenshot.shape[1]}x{screenshot.shape[0]} 像素")
 
         # 保存测试
         temp_path = Path(tempfile.gettempdir()) / "test_fullscreen.png"
-        screenshot.save(temp_path)
+        _to_image(screenshot).save(temp_path)
         print(f"📁 已保存: {temp_path}")
         return True
     except Exception as e:
@@ -27,6 +172,12 @@ def test_fullscreen_screenshot():
 def test_window_screenshot_basic():
     """测试2: 基础窗口截图（可能有DPI问题）"""
     print("\n=== 测试2: 基础窗口截图 ===")
+
+    # 进程在导入时已启用 DPI 感知：本测试线程临时切换为 DPI 不感知，
+    # 保留与测试3的对比意义（系统不支持时两者结果相同）
+    previous_context = _set_thread_dpi_awareness(DPI_AWARENESS_CONTEXT_UNAWARE)
+    if previous_context is None:
+        print("⚠️ 无法为本线程关闭 DPI 感知，结果将与测试3相同")
     try:
         # 获取前台窗口
         hwnd = ctypes.windll.user32.GetForegroundWindow()
@@ -52,30 +203,31 @@ def test_window_screenshot_basic():
 
         # 截图
         bbox = (rect.left, rect.top, rect.right, rect.bottom)
-        screenshot = ImageGrab.grab(bbox=bbox)
-        size = screenshot.size
-        print(f"📸 截图尺寸: {size[0]}x{size[1]}")
+        screenshot = _capture_bitblt(bbox)
+        print(f"📸 截图尺寸: {screenshot.shape[1]}x{screenshot.shape[0]}")
 
         # 保存测试
         temp_path = Path(tempfile.gettempdir()) / "test_window_basic.png"
-        screenshot.save(temp_path)
+        _to_image(screenshot).save(temp_path)
         print(f"📁 已保存: {temp_path}")
 
         return True
     except Exception as e:
         print(f"❌ 失败: {e}")
         return False
+    finally:
+        if previous_context is not None:
+            _set_thread_dpi_awareness(previous_context)
 
 
 def test_window_screenshot_dpi_aware():
     """测试3: DPI感知的窗口截图（更准确）"""
     print("\n=== 测试3: DPI感知窗口截图 ===")
     try:
-        # 设置 DPI 感知
-        try:
-            ctypes.windll.shcore.SetProcessDpiAwareness(2)
+        # DPI 感知已在模块导入时设置
+        if DPI_AWARE:
             print("✅ DPI 感知已启用")
-        except:
+        else:
             print("⚠️ 无法启用 DPI 感知（可能已启用）")
 
         # 获取前台窗口
@@ -101,26 +253,27 @@ def test_window_screenshot_dpi_aware():
         print(f"📐 修正坐标: {bbox}")
 
         # 截图
-        screenshot = ImageGrab.grab(bbox=bbox)
-        size = screenshot.size
-        print(f"📸 截图尺寸: {size[0]}x{size[1]}")
+        screenshot = _capture_bitblt(bbox)
+        print(f"📸 截图尺寸: {screenshot.shape[1]}x{screenshot.shape[0]}")
 
         # 保存测试
         temp_path = Path(tempfile.gettempdir()) / "test_window_dpi.png"
-        screenshot.save(temp_path)
+        _to_image(screenshot).save(temp_path)
         print(f"📁 已保存: {temp_path}")
 
         return True
     except Exception as e:
         print(f"❌ 失败: {e}")
         import traceback
-        traceback.print_exc()
+        traceback.print_exc(file=sys.stdout)  # 与其他输出一起按测试缓冲
         return False
 
 
 def compare_screenshots():
     """对比测试结果"""
     print("\n=== 对比分析 ===")
+    from PIL import Image
+
     temp_dir = Path(tempfile.gettempdir())
 
     files = {
@@ -131,7 +284,6 @@ def compare_screenshots():
 
     for name, path in files.items():
         if path.exists():
-            from PIL import Image
             img = Image.open(path)
             size = img.size
             file_size = path.stat().st_size / 1024  # KB
@@ -144,10 +296,26 @@ if __name__ == "__main__":
     print("请确保有一个窗口处于前台（如浏览器）")
     print("=" * 60)
 
-    results = []
-    results.append(("全屏截图", test_fullscreen_screenshot()))
-    results.append(("基础窗口截图", test_window_screenshot_basic()))
-    results.append(("DPI感知截图", test_window_screenshot_dpi_aware()))
+    tests = [
+        ("全屏截图", test_fullscreen_screenshot),
+        ("基础窗口截图", test_window_screenshot_basic),
+        ("DPI感知截图", test_window_screenshot_dpi_aware),
+    ]
+
+    # 三个截图测试并行执行（BitBlt 等系统调用期间释放GIL），各自保存到不同文件；
+    # 各测试的输出先按线程缓冲，再按提交顺序输出，避免交错
+    output = _ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [(name, executor.submit(output.capture, func)) for name, func in tests]
+            results = []
+            for name, future in futures:
+                success, text = future.result()
+                sys.__stdout__.write(text)
+                results.append((name, success))
+    finally:
+        sys.stdout = sys.__stdout__
 
     compare_screenshots()
 